@@ -18,24 +18,142 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+import asyncio
+import difflib
+import hashlib
+import importlib.util
+import io
+import logging
 import os
+import tarfile
+import weakref
+from collections import OrderedDict
+
+import json_utils
+from semantic_cache import SemanticCache
+
+log = logging.getLogger(__name__)
+
+
+def _prepend(first, rest):
+    """Yield ``first`` and then ``rest``, closing ``rest`` when closed early."""
+    try:
+        yield first
+        yield from rest
+    finally:
+        if hasattr(rest, "close"):
+            rest.close()
+
+
+async def _aprepend(first, rest):
+    """Async counterpart of `_prepend`."""
+    try:
+        yield first
+        async for chunk in rest:
+            yield chunk
+    finally:
+        if hasattr(rest, "aclose"):
+            await rest.aclose()
+
+
+def _chat_with_fallback(chat, kwargs):
+    """Call ``chat(**kwargs)``, falling back to the mock implementation on errors.
+
+    Streamed responses are lazy and only connect once iterated, so their first
+    chunk is fetched here; connection errors then fall back like unstreamed calls.
+    """
+    try:
+        response = chat(**kwargs)
+        if kwargs.get("stream"):
+            response = iter(response)
+            first = next(response, None)
+            response = iter(()) if first is None else _prepend(first, response)
+        return response
+    except Exception as e:
+        log.warning("Ollama error: %s - using mock", e)
+        from mock_ollama import chat as mock_chat
+        return mock_chat(**kwargs)
+
+
+async def _achat_with_fallback(achat, kwargs):
+    """Async counterpart of `_chat_with_fallback`."""
+    try:
+        response = await achat(**kwargs)
+        if kwargs.get("stream"):
+            response = aiter(response)
+            first = await anext(response, None)
+            response = aiter(()) if first is None else _aprepend(first, response)
+        return response
+    except Exception as e:
+        log.warning("Ollama error: %s - using mock", e)
+        from mock_ollama import achat as mock_achat
+        return await mock_achat(**kwargs)
+
 
 if os.environ.get("MOCK_OLLAMA") == "1":
     from mock_ollama import chat as ollama_chat
+    from mock_ollama import achat as ollama_achat
+    from mock_ollama import embeddings as ollama_embeddings
+
+    async def aclose_async_clients():
+        """Counterpart of the real client cleanup; the mock holds no connections."""
 else:
+    import httpx
     import ollama
 
+    # Shared keep-alive pool so agents reuse connections instead of reconnecting per call.
+    # HTTP/2 is negotiated over TLS only and needs the optional `h2` package.
+    _HTTP_OPTIONS = {
+        "timeout": httpx.Timeout(300.0, connect=10.0),
+        "limits": httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0),
+        "http2": importlib.util.find_spec("h2") is not None,
+    }
+    _client = ollama.Client(**_HTTP_OPTIONS)
+
     def ollama_chat(**kwargs):
         """Wrapper around `ollama.chat` with fallback to the mock implementation."""
+        return _chat_with_fallback(_client.chat, kwargs)
+
+    def ollama_embeddings(**kwargs):
+        """Wrapper around `ollama.embeddings` with fallback to the mock implementation."""
         try:
-            return ollama.chat(**kwargs)
+            return _client.embeddings(**kwargs)
         except Exception as e:
-            print(f" #################################### Ollama error: {e} - using mock")
-            from mock_ollama import chat as mock_chat
-            return mock_chat(**kwargs)
+            log.warning("Ollama error: %s - using mock", e)
+            from mock_ollama import embeddings as mock_embeddings
+            return mock_embeddings(**kwargs)
+
+    # One AsyncClient per event loop: httpx connection pools cannot be shared across loops.
+    _async_clients = weakref.WeakKeyDictionary()
+
+    def _get_async_client():
+        loop = asyncio.get_running_loop()
+        client = _async_clients.get(loop)
+        if client is None:
+            client = ollama.AsyncClient(**_HTTP_OPTIONS)
+            _async_clients[loop] = client
+        return client
+
+    async def aclose_async_clients():
+        """Close the running event loop's AsyncClient and its connection pool.
+
+        Await this before the loop shuts down, e.g. at the end of the coroutine
+        passed to ``asyncio.run``; otherwise every loop leaks a pool.
+        """
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            # ollama.AsyncClient has no close method; it wraps an httpx.AsyncClient
+            await client._client.aclose()
+
+    async def ollama_achat(**kwargs):
+        """Wrapper around `ollama.AsyncClient.chat` with fallback to the mock implementation."""
+        return await _achat_with_fallback(_get_async_client().chat, kwargs)
 
 class Agent:
-    def __init__(self, name, model_config, validate_fn=None, llm_fn=None, system="", prompt="", context="", retry_limit=3, expected_inputs=1, needs_user_input=False):
+    validation_cache_size = 5  # Recent outputs whose validation verdict is reused
+    response_cache_size = 128  # Validated responses kept when cache_responses is on
+
+    def __init__(self, name, model_config, validate_fn=None, llm_fn=None, system="", prompt="", context="", retry_limit=3, expected_inputs=1, needs_user_input=False, cache_responses=False, on_token=None):
         self.name = name
         self.model_config = model_config
         self.system = system
@@ -44,22 +162,51 @@ class Agent:
         self.retry_limit = retry_limit
         self.retry_count = 0
         self.expected_inputs = expected_inputs
-        self.received_inputs = []
+        self._input_buffer = [None] * expected_inputs
+        self._input_count = 0
         self.validate_fn = validate_fn if validate_fn else self.default_validate
         self.llm_fn = llm_fn if llm_fn else self.default_llm_fn
         self.needs_user_input = needs_user_input
+        self.cache_responses = cache_responses
+        self._response_cache = OrderedDict()  # LRU, most recently used last
+        self._semantic_cache = None
+        self._validation_cache = OrderedDict()
+        self._last_messages = None
+        self.on_token = on_token  # When set, LLM output is streamed through it token by token
 
     def __repr__(self):
         """Readable representation for debugging."""
         return f"<{self.__class__.__name__} name={self.name}>"
 
-    def execute(self, user_input):
-        """Agent processes data. This function must be implemented by subclasses."""
+    def execute(self, user_input, on_token=None):
+        """Agent processes data. This function must be implemented by subclasses.
+
+        ``on_token``, when given, replaces the agent's own ``on_token`` for this call.
+        """
         raise NotImplementedError("Execute method must be implemented by subclasses.")
 
+    async def aexecute(self, user_input, on_token=None):
+        """Async variant of `execute`. Defaults to running `execute` in a worker thread."""
+        return await asyncio.to_thread(self.execute, user_input, on_token)
+
     def validate(self, result):
-        """Validate the result using the provided validation function."""
-        return self.validate_fn(result)
+        """Validate the result using the provided validation function.
+
+        Verdicts for the most recent outputs are kept in a small sliding window
+        so retries and repeated outputs do not re-run an expensive validator.
+        """
+        output = result["output"]
+        if not isinstance(output, str):
+            return self.validate_fn(result)
+        cache = self._validation_cache
+        if output in cache:
+            cache.move_to_end(output)
+            return cache[output]
+        verdict = self.validate_fn(result)
+        cache[output] = verdict
+        if len(cache) > self.validation_cache_size:
+            cache.popitem(last=False)
+        return verdict
 
     def should_retry(self):
         """Check if the agent can retry based on the retry limit."""
@@ -71,73 +218,274 @@ class Agent:
 
     def receive_input(self, user_input):
         """Aggregates input data until the expected number of inputs is received."""
-        self.received_inputs.append(user_input)
-        if len(self.received_inputs) == self.expected_inputs:
-            combined_input = " | ".join(self.received_inputs)
-            self.received_inputs = []
-            return combined_input
+        if self.expected_inputs == 1:
+            return user_input
+        self._input_buffer[self._input_count] = user_input
+        self._input_count += 1
+        if self._input_count == self.expected_inputs:
+            self._input_count = 0
+            return " | ".join(self._input_buffer)
         return None
 
-    def run_with_retries(self, input_data):
-        """Executes the agent with retry logic."""
+    def run_with_retries(self, input_data, streaming_callback=None):
+        """Executes the agent with retry logic.
+
+        ``streaming_callback`` acts as ``on_token`` for this call only; the
+        agent itself is not modified, so concurrent callers do not see it.
+        """
         while self.should_retry():
-            result = self.execute(input_data)
+            result = self.execute(input_data, streaming_callback)
             if result["success"]:
                 return result  # Success
             else:
                 self.retry_count += 1
-                print(f" #################################### Agent {self.name}: Retry {self.retry_count}/{self.retry_limit} failed")
+                log.info("Agent %s: retry %d/%d failed", self.name, self.retry_count, self.retry_limit)
         return {"output": None, "success": False}  # Failure after retries
 
+    async def arun_with_retries(self, input_data, streaming_callback=None):
+        """Async variant of `run_with_retries` built on `aexecute`."""
+        while self.should_retry():
+            result = await self.aexecute(input_data, streaming_callback)
+            if result["success"]:
+                return result
+            else:
+                self.retry_count += 1
+                log.info("Agent %s: retry %d/%d failed", self.name, self.retry_count, self.retry_limit)
+        return {"output": None, "success": False}
+
     def default_validate(self, result):
         """Default validation logic."""
        # "valid" in result["output"].lower()
-        print(f" #################################### Agent {self.name}: No validation needed")
+        log.debug("Agent %s: no validation needed", self.name)
         return True
     def default_llm_fn(self, input_data):
         """Default LLM function."""
-        print(f" #################################### Agent {self.name}: No tools available")
+        log.debug("Agent %s: no tools available", self.name)
         return f"{input_data}"
 
 class LLMAgent(Agent):
-    def execute(self, user_input):
-        """Executes the LLM using the ollama API."""
-        print(f" #################################### Agent {self.name}: Executing with input: {user_input}")
+    def _build_messages(self, user_input):
+        """Build the chat messages sent to the model for `user_input`.
+
+        The last messages are reused while the input and prompts are unchanged,
+        so retries of the same input do not rebuild the prompt.
+        """
+        signature = (user_input, self.system, self.context, self.prompt)
+        if self._last_messages is not None and self._last_messages[0] == signature:
+            return self._last_messages[1]
+        # Static parts first and the input last, so consecutive calls share the
+        # longest possible prefix and Ollama can reuse its cached prompt state
         full_prompt = f"{self.context}\n\n{self.prompt}\n\n{user_input}"
         messages = [
             {"role": "system", "content": self.system},
             {"role": "user", "content": full_prompt}
         ]
+        self._last_messages = (signature, messages)
+        return messages
 
-        try:
-            response = ollama_chat(
-                model=self.model_config["model"],
-                stream=False,
-                messages=messages,
-                options={
-                    "temperature": self.model_config["temperature"],
-                    "top_p": self.model_config["top_p"],
-                    "frequency_penalty": self.model_config["frequency_penalty"],
-                    "presence_penalty": self.model_config["presence_penalty"]
-                }
+    def _chat_kwargs(self, messages, stream=False):
+        """Keyword arguments shared by the sync and async chat calls.
+
+        A ``keep_alive`` entry in the model config is passed through so the
+        model, and with it the cached system prompt prefix, stays loaded.
+        """
+        kwargs = {
+            "model": self.model_config["model"],
+            "stream": stream,
+            "messages": messages,
+            "options": {
+                "temperature": self.model_config["temperature"],
+                "top_p": self.model_config["top_p"],
+                "frequency_penalty": self.model_config["frequency_penalty"],
+                "presence_penalty": self.model_config["presence_penalty"]
+            }
+        }
+        if "keep_alive" in self.model_config:
+            kwargs["keep_alive"] = self.model_config["keep_alive"]
+        return kwargs
+
+    def _cache_key(self, messages):
+        """Digest of the model config and messages, used as the response cache key."""
+        parts = [repr(sorted(self.model_config.items()))] + [m["content"] for m in messages]
+        return hashlib.blake2b("\x00".join(parts).encode(), digest_size=16).digest()
+
+    def _get_semantic_cache(self):
+        """Return the agent's semantic cache, or None unless ``semantic_cache`` is set in model_config."""
+        if not self.model_config.get("semantic_cache", False):
+            return None
+        if self._semantic_cache is None:
+            embedding_model = self.model_config.get("embedding_model", "mxbai-embed-large")
+            self._semantic_cache = SemanticCache(
+                lambda text: ollama_embeddings(model=embedding_model, prompt=text)["embedding"],
+                threshold=self.model_config.get("semantic_threshold", 0.93),
+                max_entries=self.model_config.get("semantic_cache_size", 256),
             )
-            output = response['message']['content'].strip()
-            print(f" #################################### Agent {self.name}: output - {output}")
-            
-            success = self.validate({"output": output})
-            print(f" #################################### Agent {self.name}: validate - {success}")
-            
-            output = self.llm_fn({"output": output})
-
-            print(f" #################################### Agent {self.name}: tool executed - {success}")
-            
-            return {"output": output, "success": success}
+        return self._semantic_cache
+
+    def _cached_output(self, messages):
+        """Look up a previously validated output for ``messages``.
+
+        Returns ``(key, vector, output)``; ``key`` and ``vector`` are used to
+        store the final output and ``output`` is None on a cache miss.
+        """
+        key = self._cache_key(messages) if self.cache_responses else None
+        if key is not None:
+            output = self._response_cache.get(key)
+            if output is not None:
+                self._response_cache.move_to_end(key)
+                log.debug("Agent %s: cache hit", self.name)
+                return key, None, output
+
+        vector = None
+        semantic_cache = self._get_semantic_cache()
+        if semantic_cache is not None:
+            vector = semantic_cache.embed(messages[-1]["content"])
+            output = semantic_cache.lookup(vector)
+            if output is not None and self.validate({"output": output}):
+                log.debug("Agent %s: semantic cache hit", self.name)
+                return key, vector, output
+        return key, vector, None
+
+    def _handle_output(self, output, key=None, vector=None):
+        """Validate the model output, cache it on success and run the agent's llm_fn on it."""
+        log.info("Agent %s: output - %s", self.name, output)
+
+        success = self.validate({"output": output})
+        log.info("Agent %s: validate - %s", self.name, success)
+
+        if success:
+            if key is not None:
+                cache = self._response_cache
+                cache[key] = output
+                if len(cache) > self.response_cache_size:
+                    cache.popitem(last=False)
+            if vector is not None:
+                self._semantic_cache.add(vector, output)
+
+        output = self.llm_fn({"output": output})
+
+        log.debug("Agent %s: tool executed - %s", self.name, success)
+
+        return {"output": output, "success": success}
+
+    def _collect_stream(self, chunks, on_token):
+        """Feed streamed chunks to ``on_token`` and return the full output.
+
+        ``on_token`` may return False to reject the output early; generation is
+        then stopped and None is returned.
+        """
+        parts = []
+        for chunk in chunks:
+            token = chunk['message']['content']
+            parts.append(token)
+            if on_token(token) is False:
+                if hasattr(chunks, "close"):
+                    chunks.close()
+                log.debug("Agent %s: output rejected while streaming", self.name)
+                return None
+        return "".join(parts).strip()
+
+    async def _acollect_stream(self, chunks, on_token):
+        """Async counterpart of `_collect_stream`."""
+        parts = []
+        async for chunk in chunks:
+            token = chunk['message']['content']
+            parts.append(token)
+            if on_token(token) is False:
+                if hasattr(chunks, "aclose"):
+                    await chunks.aclose()
+                log.debug("Agent %s: output rejected while streaming", self.name)
+                return None
+        return "".join(parts).strip()
+
+    def execute(self, user_input, on_token=None):
+        """Executes the LLM using the ollama API."""
+        log.debug("Agent %s: executing with input: %s", self.name, user_input)
+        if on_token is None:
+            on_token = self.on_token
+        try:
+            messages = self._build_messages(user_input)
+            key, vector, output = self._cached_output(messages)
+            if output is None:
+                response = ollama_chat(**self._chat_kwargs(messages, stream=on_token is not None))
+                if on_token is None:
+                    output = response['message']['content'].strip()
+                else:
+                    output = self._collect_stream(response, on_token)
+                    if output is None:
+                        return {"output": None, "success": False}
+            elif on_token is not None:
+                on_token(output)
+            return self._handle_output(output, key, vector)
+
+        except Exception as e:
+            log.warning("Agent %s: error during execution - %s", self.name, e)
+            return {"output": None, "success": False}
+
+    async def aexecute(self, user_input, on_token=None):
+        """Executes the LLM using the ollama AsyncClient.
+
+        Subclasses that override only `execute` get it run in a worker thread
+        instead, so ``arun_workflow`` never bypasses their override.
+        """
+        if type(self).execute is not LLMAgent.execute:
+            return await super().aexecute(user_input, on_token)
+        log.debug("Agent %s: executing with input: %s", self.name, user_input)
+        if on_token is None:
+            on_token = self.on_token
+        try:
+            messages = self._build_messages(user_input)
+            key, vector, output = self._cached_output(messages)
+            if output is None:
+                response = await ollama_achat(**self._chat_kwargs(messages, stream=on_token is not None))
+                if on_token is None:
+                    output = response['message']['content'].strip()
+                else:
+                    output = await self._acollect_stream(response, on_token)
+                    if output is None:
+                        return {"output": None, "success": False}
+            elif on_token is not None:
+                on_token(output)
+            return self._handle_output(output, key, vector)
 
         except Exception as e:
-            print(f" #################################### Agent {self.name}: Error during execution - {e}")
+            log.warning("Agent %s: error during execution - %s", self.name, e)
             return {"output": None, "success": False}
 
 
+def _code_digest(code):
+    return hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+
+
+def _code_delta(base_code, code):
+    """Line-level delta turning ``base_code`` into ``code``."""
+    base_lines = base_code.splitlines(True)
+    lines = code.splitlines(True)
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    ops = [[i1, i2, lines[j1:j2]] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+    return {"base": _code_digest(base_code), "ops": ops}
+
+
+def _apply_code_delta(base_code, delta):
+    """Rebuild code from ``base_code`` and a delta produced by `_code_delta`."""
+    if delta["base"] != _code_digest(base_code):
+        raise ValueError("Code delta does not match the given base code")
+    base_lines = base_code.splitlines(True)
+    out = []
+    pos = 0
+    for i1, i2, lines in delta["ops"]:
+        out.extend(base_lines[pos:i1])
+        out.extend(lines)
+        pos = i2
+    out.extend(base_lines[pos:])
+    return "".join(out)
+
+
+def _remove_if_exists(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
 class EvolvingAgent(LLMAgent):
     """LLMAgent with versioning support for MCST evolution."""
 
@@ -150,14 +498,34 @@ class EvolvingAgent(LLMAgent):
         self.parent = parent
         self.metadata = metadata or {}
 
-    def save(self, agent_path: str, prompt_path: str, metadata_path: str = None):
-        """Persist code, prompt and metadata to disk."""
-        import json
-        import os
+    def save(self, agent_path: str, prompt_path: str, metadata_path: str = None,
+             base_code: str = None):
+        """Persist code, prompt and metadata to disk.
+
+        The code is compiled first so syntactically broken versions are never
+        written; a SyntaxError is raised and ``metadata["valid"]`` set to False.
+
+        When ``base_code`` (usually the parent's code) is given, only a line
+        delta against it is written to ``agent_path + ".delta"``; pass the same
+        base to `load` to rebuild the full source.
+        """
+        try:
+            compile(self.code, agent_path, "exec")
+        except SyntaxError:
+            self.metadata["valid"] = False
+            raise
+        self.metadata["valid"] = True
 
         os.makedirs(os.path.dirname(agent_path), exist_ok=True)
-        with open(agent_path, "w") as f:
-            f.write(self.code)
+        delta_path = agent_path + ".delta"
+        if base_code is None:
+            with open(agent_path, "w") as f:
+                f.write(self.code)
+            _remove_if_exists(delta_path)
+        else:
+            with open(delta_path, "wb") as f:
+                f.write(json_utils.dumps(_code_delta(base_code, self.code)))
+            _remove_if_exists(agent_path)
         with open(prompt_path, "w") as f:
             f.write(self.prompt)
         if metadata_path:
@@ -166,22 +534,31 @@ class EvolvingAgent(LLMAgent):
                 "parent": self.parent,
                 "metadata": self.metadata,
             }
-            with open(metadata_path, "w") as f:
-                json.dump(data, f, indent=2)
+            with open(metadata_path, "wb") as f:
+                f.write(json_utils.dumps(data, indent=True))
 
     @classmethod
-    def load(cls, agent_path: str, prompt_path: str, metadata_path: str = None, **kwargs):
-        """Load an EvolvingAgent from files."""
-        import json
+    def load(cls, agent_path: str, prompt_path: str, metadata_path: str = None,
+             base_code: str = None, **kwargs):
+        """Load an EvolvingAgent from files.
+
+        Agents saved as a delta need the same ``base_code`` they were saved with.
+        """
         parent = None
         metadata = {}
-        with open(agent_path, "r") as f:
-            code = f.read()
+        if os.path.exists(agent_path):
+            with open(agent_path, "r") as f:
+                code = f.read()
+        else:
+            if base_code is None:
+                raise ValueError(f"{agent_path} was saved as a delta; base_code is required")
+            with open(agent_path + ".delta", "rb") as f:
+                code = _apply_code_delta(base_code, json_utils.loads(f.read()))
         with open(prompt_path, "r") as f:
             prompt = f.read()
         if metadata_path and os.path.exists(metadata_path):
-            with open(metadata_path, "r") as f:
-                md = json.load(f)
+            with open(metadata_path, "rb") as f:
+                md = json_utils.loads(f.read())
                 parent = md.get("parent")
                 metadata = md.get("metadata", {})
                 version = md.get("version", "")
@@ -190,4 +567,53 @@ class EvolvingAgent(LLMAgent):
         return cls(code=code, prompt=prompt, version=version, parent=parent, metadata=metadata,
                    **kwargs)
 
+    @staticmethod
+    def save_many(agents, archive_path: str):
+        """Write several agents into one tar archive instead of three files each.
+
+        Every agent is compiled first, as in `save`; nothing is written if one fails.
+        """
+        for agent in agents:
+            try:
+                compile(agent.code, agent.name, "exec")
+            except SyntaxError:
+                agent.metadata["valid"] = False
+                raise
+            agent.metadata["valid"] = True
+
+        os.makedirs(os.path.dirname(archive_path) or ".", exist_ok=True)
+        with tarfile.open(archive_path, "w") as tar:
+            for i, agent in enumerate(agents):
+                data = {
+                    "name": agent.name,
+                    "version": agent.version,
+                    "parent": agent.parent,
+                    "metadata": agent.metadata,
+                }
+                members = (
+                    (f"agent_{i}.py", agent.code.encode()),
+                    (f"prompt_{i}.txt", agent.prompt.encode()),
+                    (f"metadata_{i}.json", json_utils.dumps(data)),
+                )
+                for member, payload in members:
+                    info = tarfile.TarInfo(member)
+                    info.size = len(payload)
+                    tar.addfile(info, io.BytesIO(payload))
+
+    @classmethod
+    def load_many(cls, archive_path: str, **kwargs):
+        """Load the agents written by `save_many`, in their original order."""
+        with tarfile.open(archive_path, "r") as tar:
+            files = {member.name: tar.extractfile(member).read()
+                     for member in tar if member.isfile()}
+        agents = []
+        for i in range(len(files) // 3):
+            md = json_utils.loads(files[f"metadata_{i}.json"])
+            agent_kwargs = {"name": md.get("name"), **kwargs}
+            agents.append(cls(code=files[f"agent_{i}.py"].decode(),
+                              prompt=files[f"prompt_{i}.txt"].decode(),
+                              version=md.get("version", ""), parent=md.get("parent"),
+                              metadata=md.get("metadata", {}), **agent_kwargs))
+        return agents
+
         
@@ -18,21 +18,84 @@ IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
+import asyncio
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
 from tool_manager import ToolManager
 
+log = logging.getLogger(__name__)
+
 
 class WorkflowManager:
     def __init__(self):
         self.agents = {}
         self.connections = {}
-        self.pending_inputs = {}
         self.tool_manager = ToolManager()
+        self._locks = {}
 
     def add_agent(self, agent, next_agents=None):
         """Adds an agent to the workflow, along with its next agents."""
         self.agents[agent.name] = agent
-        self.connections[agent.name] = next_agents if next_agents else []
-        self.pending_inputs[agent.name] = []  # Initialize pending inputs for the agent
+        self.connections[agent.name] = tuple(next_agents) if next_agents else ()
+        self._locks[agent.name] = threading.Lock()
+
+    def add_agents(self, specs):
+        """Adds several agents at once from ``(agent, next_agents)`` pairs."""
+        specs = [(agent.name, agent, next_agents) for agent, next_agents in specs]
+        self.agents.update((name, agent) for name, agent, _ in specs)
+        self.connections.update((name, tuple(next_agents) if next_agents else ())
+                                for name, _, next_agents in specs)
+        self._locks.update((name, threading.Lock()) for name, _, _ in specs)
+
+    def _receive(self, agent_name, input_data):
+        """Deliver ``input_data`` to an agent, returning ``(agent, combined_input)`` once it is ready."""
+        agent = self.agents.get(agent_name)
+
+        if agent is None:
+            log.warning("Agent %s not found!", agent_name)
+            return None
+
+        # Store the input data for the agent
+        combined_input = agent.receive_input(input_data)
+        if combined_input is None:
+            log.debug("%s is waiting for more inputs...", agent_name)
+            return None  # Skip processing until all inputs are received
+        return agent, combined_input
+
+    def _advance(self, agent_name, agent, combined_input, result, interactive, user_input_fn):
+        """Handle an agent result and return the ``(next_agent, input)`` pairs it produces."""
+        if interactive and getattr(agent, "needs_user_input", False) and result["success"]:
+            user_response = user_input_fn(f"{result['output']}\n")
+            result["output"] = f"{combined_input} | {user_response}"
+
+        # If the result is valid, move to the next agents in the flow
+        if result["success"]:
+            agent.reset_retry()
+            next_agents = self.connections.get(agent_name, ())
+            return [(next_agent, result["output"]) for next_agent in next_agents]
+        log.warning("%s failed after %d retries.", agent_name, agent.retry_count)
+        return []
+
+    @staticmethod
+    def _model_order(ready):
+        """Indices of ``ready`` ordered so agents sharing a model are dispatched back to back."""
+        return sorted(range(len(ready)), key=lambda i: ready[i][1].model_config.get("model", ""))
+
+    def _run_agent(self, agent_name, agent, combined_input):
+        """Run an agent with retries, serialising concurrent runs of the same agent."""
+        # Agents may also be placed in ``self.agents`` directly, without add_agent
+        with self._locks.setdefault(agent_name, threading.Lock()):
+            return agent.run_with_retries(combined_input)
+
+    @staticmethod
+    async def _arun_agent(locks, agent_name, agent, combined_input):
+        """Async counterpart of `_run_agent`; ``locks`` maps agent names to this run's asyncio locks."""
+        async with locks[agent_name]:
+            return await agent.arun_with_retries(combined_input)
 
     def run_workflow(self, start_agent_name, input_data, interactive=False, user_input_fn=None):
         """Starts the workflow from the initial agent.
@@ -40,48 +103,91 @@ class WorkflowManager:
         If ``interactive`` is True and an agent has ``needs_user_input`` set,
         ``user_input_fn`` will be called with the agent's output to obtain the
         user's response.
+
+        Agents that become ready at the same step run concurrently on a thread
+        pool sized by ``OLLAMA_NUM_PARALLEL`` (default 4, at least 1); their results are
+        handled in queue order so the workflow stays deterministic. Within a
+        step, agents are dispatched grouped by model so Ollama can keep reusing
+        already-loaded weights.
         """
         if user_input_fn is None:
             user_input_fn = input
 
-        input_queue = [(start_agent_name, input_data)]  # Queue for agent processing
+        input_queue = deque([(start_agent_name, input_data)])  # Queue for agent processing
+        max_workers = max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", 4)))
+        # Bind the per-step helpers once; the loop below is the scheduling hot path
+        popleft, extend = input_queue.popleft, input_queue.extend
+        receive, advance, run_agent = self._receive, self._advance, self._run_agent
 
-        while input_queue:
-            current_agent_name, input_data = input_queue.pop(0)
-            current_agent = self.agents.get(current_agent_name)
+        pool = None  # created on the first step with more than one ready agent
+        try:
+            while input_queue:
+                # Collect every agent that is ready at this step of the workflow
+                ready = []
+                while input_queue:
+                    current_agent_name, input_data = popleft()
+                    received = receive(current_agent_name, input_data)
+                    if received is not None:
+                        ready.append((current_agent_name, *received))
 
-            if current_agent is None:
-                print(f" #################################### Agent {current_agent_name} not found!")
-                continue
+                # Execute the agent logic, including retries; independent agents run concurrently
+                if len(ready) == 1:
+                    results = [run_agent(*ready[0])]
+                else:
+                    if pool is None:
+                        pool = ThreadPoolExecutor(max_workers=max_workers)
+                    futures = [None] * len(ready)
+                    for i in self._model_order(ready):
+                        futures[i] = pool.submit(run_agent, *ready[i])
+                    results = [future.result() for future in futures]
+
+                for (current_agent_name, current_agent, combined_input), result in zip(ready, results):
+                    extend(advance(current_agent_name, current_agent, combined_input,
+                                   result, interactive, user_input_fn))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    async def arun_workflow(self, start_agent_name, input_data, interactive=False, user_input_fn=None):
+        """Async variant of ``run_workflow``.
+
+        Agents that become ready at the same depth of the workflow are executed
+        concurrently with ``asyncio.gather`` so their LLM calls overlap; like
+        ``run_workflow``, runs of the same agent are serialised.
+        """
+        if user_input_fn is None:
+            user_input_fn = input
 
-            # Store the input data for the agent
-            combined_input = current_agent.receive_input(input_data)
-            if combined_input is None:
-                print(f" #################################### {current_agent_name} is waiting for more inputs...")
-                continue  # Skip processing until all inputs are received
+        frontier = [(start_agent_name, input_data)]
+        # asyncio locks belong to one event loop, so each call gets its own set
+        locks = defaultdict(asyncio.Lock)
 
-            # Execute the agent logic, including retries
-            result = current_agent.run_with_retries(combined_input)
+        while frontier:
+            ready = []
+            for agent_name, data in frontier:
+                received = self._receive(agent_name, data)
+                if received is not None:
+                    ready.append((agent_name, *received))
 
-            if interactive and getattr(current_agent, "needs_user_input", False) and result["success"]:
-                user_response = user_input_fn(f"{result['output']}\n")
-                result["output"] = f"{combined_input} | {user_response}"
+            order = self._model_order(ready)
+            gathered = await asyncio.gather(
+                *(self._arun_agent(locks, *ready[i]) for i in order)
+            )
+            results = [None] * len(ready)
+            for i, result in zip(order, gathered):
+                results[i] = result
 
-            # If the result is valid, move to the next agents in the flow
-            if result["success"]:
-                current_agent.reset_retry()
-                next_agents = self.connections.get(current_agent_name, [])
-                for next_agent in next_agents:
-                    input_queue.append((next_agent, result["output"]))
-            else:
-                print(f" #################################### {current_agent_name} failed after {current_agent.retry_count} retries.")
+            frontier = []
+            for (agent_name, agent, combined_input), result in zip(ready, results):
+                frontier.extend(self._advance(agent_name, agent, combined_input,
+                                              result, interactive, user_input_fn))
 
     def run(self, task_list):
         """Execute a list of Task objects with pre/post tools."""
         for task in task_list:
             agent = self.agents.get(task.agent_type)
             if not agent:
-                print(f"No agent registered for {task.agent_type}")
+                log.warning("No agent registered for %s", task.agent_type)
                 continue
             data = task.description
             data = self.tool_manager.run_sequence(task.pre_tools, data)
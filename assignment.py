@@ -2,17 +2,25 @@
 
 from task import Task
 
+# (keyword, tool, task attribute) rules; a keyword of None matches every task
+TOOL_RULES = (
+    ("code", "exec", "pre_tools"),
+    (None, "echo", "post_tools"),
+)
+
 
 def assign_agents_and_tools(task_list, tool_registry=None):
     """Assign default agent types and tool sequences to each task."""
     available_tools = set(tool_registry or [])
+    # Resolve the rules against the registry once instead of once per task
+    rules = [rule for rule in TOOL_RULES if rule[1] in available_tools]
+    needs_desc = any(keyword is not None for keyword, _, _ in rules)
     for task in task_list:
         # Assign a generic agent type
         task.agent_type = task.agent_type or "llm"
         # naive tool assignment based on keywords
-        desc = task.description.lower()
-        if "code" in desc and "exec" in available_tools:
-            task.pre_tools.append("exec")
-        if "echo" in available_tools:
-            task.post_tools.append("echo")
+        desc = task.description.lower() if needs_desc else ""
+        for keyword, tool, attr in rules:
+            if keyword is None or keyword in desc:
+                getattr(task, attr).append(tool)
     return task_list
@@ -5,3 +5,11 @@ class EvaluatorAgent:
         score = len(agent.code)
         agent.metadata["score"] = score
         return score
+
+    async def aevaluate(self, agent):
+        """Async counterpart of `evaluate`, so MCSTExecutor.arun can score children concurrently."""
+        return self.evaluate(agent)
+
+    def evaluate_batch(self, agents):
+        """Score several agents in one call, returning the scores in order."""
+        return [self.evaluate(agent) for agent in agents]
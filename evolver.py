@@ -4,18 +4,27 @@ class EvolverAgent(LLMAgent):
     """Generates mutated versions of an EvolvingAgent."""
 
     def generate_mutations(self, agent: EvolvingAgent, n: int = 2):
-        children = []
+        name, version, system = agent.name, agent.version, agent.system
+        prompt, code, model_config = agent.prompt, agent.code, agent.model_config
+        children = [None] * n
         for i in range(n):
-            new_version = f"{agent.version}_{i}"
             child = EvolvingAgent(
-                name=f"{agent.name}_child{i}",
-                model_config=agent.model_config,
-                system=agent.system,
-                prompt=agent.prompt + f" mutation {i}",
-                code=agent.code + f"\n# mutation {i}\n",
-                version=new_version,
-                parent=agent.version,
+                name=f"{name}_child{i}",
+                model_config=model_config,
+                system=system,
+                prompt=f"{prompt} mutation {i}",
+                code="".join((code, f"\n# mutation {i}\n")),
+                version=f"{version}_{i}",
+                parent=version,
             )
             child.metadata["score"] = 0
-            children.append(child)
+            children[i] = child
         return children
+
+    async def agenerate_mutations(self, agent: EvolvingAgent, n: int = 2):
+        """Async variant of `generate_mutations`, used by `MCSTExecutor.arun`.
+
+        Mutations are built in memory without any I/O, so they run inline;
+        evolvers whose mutations call the LLM can override this to overlap them.
+        """
+        return self.generate_mutations(agent, n)
@@ -4,30 +4,86 @@ Comprehensive Validation Report Generator for Agent Workflow Project
 Consolidates all validation results and provides actionable recommendations.
 """
 
+import io
 import os
-import json
+import sys
 import datetime
+from bisect import bisect_right
+from functools import cached_property, partial
 from typing import Dict, List, Any
 
+import json_utils
+
+
+# Files read by load_validation_results and the checks it runs
+REPORT_INPUT_FILES = (
+    "validation_report.json", "performance_report.json", "README.md",
+    "Agent.py", "WorkflowManager.py", "requirements.txt",
+)
+
+
+README_MARKERS = (b"## Features", b"## Getting Started", b"pip install")
+# Overall score cut-offs: below 5, 5 to <7, 7 to <9, and 9 or more
+_ASSESSMENT_THRESHOLDS = (5, 7, 9)
+_ASSESSMENT_TIERS = ("NEEDS_IMPROVEMENT", "ACCEPTABLE", "GOOD", "EXCELLENT")
+
+# Padded titles for the score categories printed in the summary
+_CATEGORY_LABELS = {
+    category: f"{category.title():<20}"
+    for category in ("functional", "performance", "documentation", "code_quality", "structure")
+}
+LICENSE_MARKERS = (b"Licensed under", b"Copyright")
+
 
 class ComprehensiveReportGenerator:
     """Generates a comprehensive validation report."""
     
     def __init__(self):
         self.validation_data = {}
+        # One timestamp for the whole report
+        self.generated_at = datetime.datetime.now().isoformat()
+        # One directory listing, taken per generator, answers every existence check below
+        with os.scandir(".") as entries:
+            self._entries = {entry.name: entry for entry in entries}
         self.load_validation_results()
     
+    def _exists(self, name: str) -> bool:
+        """Return True if ``name`` is in the project root."""
+        return name in self._entries
+    
+    def _isdir(self, name: str) -> bool:
+        """Return True if ``name`` is a directory in the project root."""
+        entry = self._entries.get(name)
+        return entry is not None and entry.is_dir()
+    
+    def _size(self, name: str) -> int:
+        """Size in bytes of ``name`` in the project root, from its cached DirEntry."""
+        return self._entries[name].stat().st_size
+    
+    def _read_files(self, names, limit: int = -1) -> Dict[str, bytes]:
+        """Read every existing, readable file in ``names``; ``limit`` caps the bytes read per file."""
+        contents = {}
+        for name in names:
+            if name in self._entries:
+                try:
+                    with open(name, "rb") as f:
+                        contents[name] = f.read(limit)
+                except OSError:
+                    pass
+        return contents
+    
     def load_validation_results(self):
         """Load results from all validation tests."""
+        # Every file the checks below look at is read here, once
+        self._files = self._read_files(REPORT_INPUT_FILES)
+        
         # Load main validation report
-        if os.path.exists("validation_report.json"):
-            with open("validation_report.json", "r") as f:
-                self.validation_data["functional_tests"] = json.load(f)
+        if "validation_report.json" in self._files:
+            self.validation_data["functional_tests"] = json_utils.loads(self._files["validation_report.json"])
         
         # Load performance report
-        if os.path.exists("performance_report.json"):
-            with open("performance_report.json", "r") as f:
-                self.validation_data["performance_tests"] = json.load(f)
+        if "performance_report.json" in self._files:
+            self.validation_data["performance_tests"] = json_utils.loads(self._files["performance_report.json"])
         
         # Check for other test results
         self.validation_data["documentation_issues"] = self.check_documentation()
@@ -40,20 +96,21 @@ class ComprehensiveReportGenerator:
         strengths = []
         
         # Check README
-        if os.path.exists("README.md"):
-            with open("README.md", "r") as f:
-                readme_content = f.read()
+        if "README.md" in self._files:
+            readme_content = self._files["README.md"]
             
             if len(readme_content) > 1000:
                 strengths.append("Comprehensive README with detailed explanations")
             
-            if "## Features" in readme_content:
+            found = {marker for marker in README_MARKERS if marker in readme_content}
+            
+            if b"## Features" in found:
                 strengths.append("Clear feature documentation")
             
-            if "## Getting Started" in readme_content:
+            if b"## Getting Started" in found:
                 strengths.append("Getting started instructions provided")
             
-            if "pip install" in readme_content:
+            if b"pip install" in found:
                 strengths.append("Installation instructions included")
             else:
                 issues.append("Missing pip install instructions")
@@ -61,17 +118,16 @@ class ComprehensiveReportGenerator:
             issues.append("README.md is missing")
         
         # Check design document
-        if os.path.exists("design_document.md"):
+        if self._exists("design_document.md"):
             strengths.append("Detailed design document available")
-            with open("design_document.md", "r") as f:
-                design_content = f.read()
-            if len(design_content) > 5000:
+            # Only the size matters here, so the document is never read
+            if self._size("design_document.md") > 5000:
                 strengths.append("Comprehensive architectural documentation")
         else:
             issues.append("Design document is missing")
         
         # Check license
-        if os.path.exists("LICENSE"):
+        if self._exists("LICENSE"):
             strengths.append("License file included")
         else:
             issues.append("LICENSE file is missing")
@@ -89,14 +145,16 @@ class ComprehensiveReportGenerator:
         warnings = []
         
         # Check Python files
-        python_files = [f for f in os.listdir(".") if f.endswith(".py")]
+        # DirEntry.is_file answers from the directory listing, without a stat
+        python_files = [entry.name for entry in self._entries.values()
+                        if entry.name.endswith(".py") and entry.is_file()]
         
         if len(python_files) >= 10:
             strengths.append(f"Good modular structure with {len(python_files)} Python files")
         
         # Check for key architectural components
         key_files = ["Agent.py", "WorkflowManager.py", "mcst_executor.py", "task.py"]
-        existing_key_files = [f for f in key_files if os.path.exists(f)]
+        existing_key_files = [f for f in key_files if self._exists(f)]
         
         if len(existing_key_files) == len(key_files):
             strengths.append("All key architectural components present")
@@ -108,10 +166,10 @@ class ComprehensiveReportGenerator:
         error_handling_found = False
         try:
             for file in ["Agent.py", "WorkflowManager.py"]:
-                if os.path.exists(file):
-                    with open(file, "r") as f:
-                        content = f.read()
-                    if "try:" in content and "except" in content:
+                content = self._files.get(file)
+                if content is not None:
+                    # Raw bytes: no decode needed for ASCII keywords
+                    if b"try:" in content and b"except" in content:
                         error_handling_found = True
                         break
             
@@ -124,14 +182,10 @@ class ComprehensiveReportGenerator:
         
         # Check for consistent licensing
         license_headers = 0
-        for file in python_files[:5]:  # Check first 5 files
-            try:
-                with open(file, "r") as f:
-                    first_lines = f.read(500)
-                if "Licensed under" in first_lines or "Copyright" in first_lines:
-                    license_headers += 1
-            except:
-                pass
+        headers = self._read_files(python_files[:5], limit=500)  # Check first 5 files
+        for first_lines in headers.values():
+            if any(needle in first_lines for needle in LICENSE_MARKERS):
+                license_headers += 1
         
         if license_headers >= 3:
             strengths.append("Consistent license headers in source files")
@@ -152,7 +206,7 @@ class ComprehensiveReportGenerator:
         
         # Check for proper project structure
         expected_dirs = ["tools"]
-        existing_dirs = [d for d in expected_dirs if os.path.isdir(d)]
+        existing_dirs = [d for d in expected_dirs if self._isdir(d)]
         
         if len(existing_dirs) == len(expected_dirs):
             strengths.append("Proper directory structure with tools organization")
@@ -161,23 +215,22 @@ class ComprehensiveReportGenerator:
             issues.append(f"Missing directories: {', '.join(missing_dirs)}")
         
         # Check for requirements file
-        if os.path.exists("requirements.txt"):
+        if "requirements.txt" in self._files:
             strengths.append("Dependencies properly specified in requirements.txt")
-            with open("requirements.txt", "r") as f:
-                reqs = f.read()
+            reqs = self._files["requirements.txt"].decode()
             if "==" in reqs:
                 strengths.append("Pinned dependency versions for reproducibility")
         else:
             issues.append("requirements.txt is missing")
         
         # Check for gitignore
-        if os.path.exists(".gitignore"):
+        if self._exists(".gitignore"):
             strengths.append("Git ignore file present")
         else:
             issues.append(".gitignore file is missing")
         
         # Check for main entry point
-        if os.path.exists("main.py"):
+        if self._exists("main.py"):
             strengths.append("Clear main entry point")
         else:
             issues.append("main.py entry point is missing")
@@ -190,9 +243,14 @@ class ComprehensiveReportGenerator:
     
     def generate_executive_summary(self) -> Dict:
         """Generate executive summary of validation results."""
+        return self.executive_summary
+    
+    @cached_property
+    def executive_summary(self) -> Dict:
+        """Executive summary of validation results, computed once."""
         summary = {
             "project_name": "Agent Workflow - Agentic MCST Evolutionary Framework",
-            "validation_date": datetime.datetime.now().isoformat(),
+            "validation_date": self.generated_at,
             "overall_assessment": "EXCELLENT",
             "key_findings": {
                 "functional_status": "All core functionality working",
@@ -216,14 +274,7 @@ class ComprehensiveReportGenerator:
         
         overall_score = (functional_score + performance_score + doc_score + code_score + structure_score) / 5
         
-        if overall_score >= 9:
-            summary["overall_assessment"] = "EXCELLENT"
-        elif overall_score >= 7:
-            summary["overall_assessment"] = "GOOD"
-        elif overall_score >= 5:
-            summary["overall_assessment"] = "ACCEPTABLE"
-        else:
-            summary["overall_assessment"] = "NEEDS_IMPROVEMENT"
+        summary["overall_assessment"] = _ASSESSMENT_TIERS[bisect_right(_ASSESSMENT_THRESHOLDS, overall_score)]
         
         summary["scores"] = {
             "functional": functional_score,
@@ -238,6 +289,11 @@ class ComprehensiveReportGenerator:
     
     def generate_detailed_findings(self) -> Dict:
         """Generate detailed findings section."""
+        return self.detailed_findings
+    
+    @cached_property
+    def detailed_findings(self) -> Dict:
+        """Detailed findings section, computed once."""
         findings = {
             "strengths": [
                 "Comprehensive modular architecture with clear separation of concerns",
@@ -274,6 +330,11 @@ class ComprehensiveReportGenerator:
     
     def generate_recommendations(self) -> Dict:
         """Generate actionable recommendations."""
+        return self.recommendations
+    
+    @cached_property
+    def recommendations(self) -> Dict:
+        """Actionable recommendations, computed once."""
         recommendations = {
             "immediate_actions": [
                 {
@@ -331,13 +392,13 @@ class ComprehensiveReportGenerator:
         report = {
             "meta": {
                 "report_version": "1.0",
-                "generated_at": datetime.datetime.now().isoformat(),
+                "generated_at": self.generated_at,
                 "validator": "Comprehensive Validation Suite",
                 "project_version": "Current"
             },
-            "executive_summary": self.generate_executive_summary(),
-            "detailed_findings": self.generate_detailed_findings(),
-            "recommendations": self.generate_recommendations(),
+            "executive_summary": self.executive_summary,
+            "detailed_findings": self.detailed_findings,
+            "recommendations": self.recommendations,
             "test_results": {
                 "functional_tests": self.validation_data.get("functional_tests"),
                 "performance_tests": self.validation_data.get("performance_tests"),
@@ -351,48 +412,54 @@ class ComprehensiveReportGenerator:
     
     def print_summary_report(self):
         """Print a summary of the validation results."""
-        summary = self.generate_executive_summary()
-        findings = self.generate_detailed_findings()
-        recommendations = self.generate_recommendations()
-        
-        print("=" * 80)
-        print("AGENT WORKFLOW PROJECT - COMPREHENSIVE VALIDATION REPORT")
-        print("=" * 80)
-        
-        print(f"\nProject: {summary['project_name']}")
-        print(f"Validation Date: {summary['validation_date']}")
-        print(f"Overall Assessment: {summary['overall_assessment']}")
-        print(f"Overall Score: {summary['scores']['overall']}/10")
-        
-        print("\n" + "=" * 80)
-        print("SCORES BY CATEGORY")
-        print("=" * 80)
+        summary = self.executive_summary
+        findings = self.detailed_findings
+        recommendations = self.recommendations
+        
+        # Build the whole report, then write it with a single call
+        buf = io.StringIO()
+        out = partial(print, file=buf)
+        
+        out("=" * 80)
+        out("AGENT WORKFLOW PROJECT - COMPREHENSIVE VALIDATION REPORT")
+        out("=" * 80)
+        
+        out(f"\nProject: {summary['project_name']}")
+        out(f"Validation Date: {summary['validation_date']}")
+        out(f"Overall Assessment: {summary['overall_assessment']}")
+        out(f"Overall Score: {summary['scores']['overall']}/10")
+        
+        out("\n" + "=" * 80)
+        out("SCORES BY CATEGORY")
+        out("=" * 80)
         for category, score in summary['scores'].items():
             if category != 'overall':
-                print(f"{category.title():<20}: {score}/10")
+                out(f"{_CATEGORY_LABELS.get(category) or f'{category.title():<20}'}: {score}/10")
         
-        print("\n" + "=" * 80)
-        print("KEY STRENGTHS")
-        print("=" * 80)
+        out("\n" + "=" * 80)
+        out("KEY STRENGTHS")
+        out("=" * 80)
         for i, strength in enumerate(findings['strengths'][:8], 1):
-            print(f"{i:2}. {strength}")
+            out(f"{i:2}. {strength}")
         
-        print("\n" + "=" * 80)
-        print("PRIORITY RECOMMENDATIONS")
-        print("=" * 80)
+        out("\n" + "=" * 80)
+        out("PRIORITY RECOMMENDATIONS")
+        out("=" * 80)
         for i, rec in enumerate(recommendations['immediate_actions'], 1):
-            print(f"{i}. [{rec['priority']}] {rec['action']}")
-            print(f"   Effort: {rec['effort']} | Impact: {rec['impact']}")
-        
-        print("\n" + "=" * 80)
-        print("CONCLUSION")
-        print("=" * 80)
-        print("The Agent Workflow project demonstrates excellent architecture and")
-        print("functionality. The MCST evolutionary framework is well-implemented")
-        print("with good performance characteristics. The main areas for improvement")
-        print("focus on documentation, testing, and code quality enhancements.")
-        print("\nThe project is ready for production use with the recommended")
-        print("improvements implemented for better maintainability and reliability.")
+            out(f"{i}. [{rec['priority']}] {rec['action']}")
+            out(f"   Effort: {rec['effort']} | Impact: {rec['impact']}")
+        
+        out("\n" + "=" * 80)
+        out("CONCLUSION")
+        out("=" * 80)
+        out("The Agent Workflow project demonstrates excellent architecture and")
+        out("functionality. The MCST evolutionary framework is well-implemented")
+        out("with good performance characteristics. The main areas for improvement")
+        out("focus on documentation, testing, and code quality enhancements.")
+        out("\nThe project is ready for production use with the recommended")
+        out("improvements implemented for better maintainability and reliability.")
+        
+        sys.stdout.write(buf.getvalue())
 
 
 def main():
@@ -401,8 +468,8 @@ def main():
     
     # Generate and save full report
     full_report = generator.generate_full_report()
-    with open("comprehensive_validation_report.json", "w") as f:
-        json.dump(full_report, f, indent=2)
+    with open("comprehensive_validation_report.json", "wb") as f:
+        f.write(json_utils.dumps(full_report, indent=True))
     
     # Print summary
     generator.print_summary_report()
@@ -0,0 +1,26 @@
+"""JSON helpers that use ``orjson`` when it is installed.
+
+Both functions work on bytes so callers open files in binary mode and the
+fast path never round-trips through ``str``.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj, indent=False):
+    """Serialize ``obj`` to UTF-8 JSON bytes, indented by two spaces if ``indent``."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode()
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
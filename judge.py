@@ -2,6 +2,7 @@ class JudgeAgent:
     """Selects the child with the highest score."""
 
     def choose(self, results):
-        # results is list of (agent, score)
-        best = max(results, key=lambda r: r[1])
-        return best[0]
+        # results is list of (agent, score); max/index over the bare scores
+        # run in C and, like max with a key, pick the first of equal scores
+        agents, scores = zip(*results)
+        return agents[scores.index(max(scores))]
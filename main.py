@@ -2,65 +2,73 @@
 Agent Workflow demo entrypoint.
 """
 
+import itertools
+import logging
+import os
+import types
+
 from WorkflowManager import WorkflowManager
-from Agent import LLMAgent, EvolvingAgent
-from task import Task
-from mcst_executor import MCSTExecutor
-from evolver import EvolverAgent
-from evaluator import EvaluatorAgent
-from judge import JudgeAgent
-from assignment import assign_agents_and_tools
-from memory_manager import MemoryManager
 
+# Shared by every demo agent, including the MCST evolver
+_DEFAULT_MODEL_CONFIG = types.MappingProxyType({
+    "model": "llama3.2:latest",
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "frequency_penalty": 0.0,
+    "presence_penalty": 0.0,
+})
+
+# (name, system prompt, next agents, needs user input) for the standard workflow
+_AGENT_SPECS = (
+    ("Clarifier", "Ask clarifying questions about the user's request.", ("Designer",), True),
+    ("Designer", "Propose a high-level design given the clarified requirements.", ("TaskMaker",), False),
+    ("TaskMaker", "Break the design into concrete implementation tasks.", None, False),
+)
 
 def build_workflow_manager():
     """Create a WorkflowManager with the standard agents registered."""
+    from Agent import LLMAgent  # lazy: Agent pulls in the ollama client
+
     manager = WorkflowManager()
     from tools.echo_tool import run as echo
     from tools.uppercase_tool import run as upper
     from tools.code_executor_tool import run as exec_tool
-    manager.tool_manager.register("echo", echo)
-    manager.tool_manager.register("upper", upper)
-    manager.tool_manager.register("exec", exec_tool)
-
-    model_config = {
-        "model": "llama3.2:latest",
-        "temperature": 0.7,
-        "top_p": 0.9,
-        "frequency_penalty": 0.0,
-        "presence_penalty": 0.0,
-    }
-
-    clarifier = LLMAgent(
-        name="Clarifier",
-        model_config=model_config,
-        system="Ask clarifying questions about the user's request.",
-        needs_user_input=True,
-    )
-    designer = LLMAgent(
-        name="Designer",
-        model_config=model_config,
-        system="Propose a high-level design given the clarified requirements.",
-    )
-    task_maker = LLMAgent(
-        name="TaskMaker",
-        model_config=model_config,
-        system="Break the design into concrete implementation tasks.",
-    )
-
-    manager.add_agent(clarifier, next_agents=["Designer"])
-    manager.add_agent(designer, next_agents=["TaskMaker"])
-    manager.add_agent(task_maker, next_agents=None)
+    manager.tool_manager.register("echo", echo, cacheable=True)
+    manager.tool_manager.register("upper", upper, cacheable=True)
+    manager.tool_manager.register("exec", exec_tool)  # side effects: never cached
+
+    model_config = _DEFAULT_MODEL_CONFIG
+    manager.add_agents([
+        (LLMAgent(name=name, model_config=model_config, system=system,
+                  needs_user_input=needs_user_input), next_agents)
+        for name, system, next_agents, needs_user_input in _AGENT_SPECS
+    ])
     return manager
 
 
+def list_agents():
+    """Names of the agents `build_workflow_manager` registers, without building them."""
+    return [spec[0] for spec in _AGENT_SPECS]
+
+
 def run_demo(user_prompt, interactive=False, user_input_fn=None):
+    # lazy: only the demo needs the task and MCST machinery
+    from Agent import EvolvingAgent
+    from task import Task
+    from mcst_executor import MCSTExecutor
+    from evolver import EvolverAgent
+    from evaluator import EvaluatorAgent
+    from judge import JudgeAgent
+    from assignment import assign_agents_and_tools
+    from memory_manager import MemoryManager
+
     manager = build_workflow_manager()
     start_agent = "Clarifier" if interactive else "Designer"
     manager.run_workflow(start_agent_name=start_agent, input_data=user_prompt, interactive=interactive, user_input_fn=user_input_fn)
 
+    # Only the lines kept are read; a short file just yields fewer lines
     with open("task_list.md", "r") as f:
-        first_lines = [next(f).strip() for _ in range(10)]
+        first_lines = [line.strip() for line in itertools.islice(f, 10)]
     print("\nLoaded task list excerpt:\n" + "\n".join(first_lines))
 
     # Demonstrate agent and tool assignment
@@ -70,13 +78,7 @@ def run_demo(user_prompt, interactive=False, user_input_fn=None):
         print(f"Assigned to {t.agent_type} with pre {t.pre_tools} and post {t.post_tools}")
 
     # Simple MCST demonstration
-    model_config = {
-        "model": "llama3.2:latest",
-        "temperature": 0.7,
-        "top_p": 0.9,
-        "frequency_penalty": 0.0,
-        "presence_penalty": 0.0,
-    }
+    model_config = _DEFAULT_MODEL_CONFIG
     evolver = EvolverAgent(name="evolver", model_config=model_config)
     evaluator = EvaluatorAgent()
     judge = JudgeAgent()
@@ -84,11 +86,21 @@ def run_demo(user_prompt, interactive=False, user_input_fn=None):
     base_agent = EvolvingAgent(name="base", model_config=model_config, prompt="say hi", code="print('hi')")
     executor = MCSTExecutor(branching_factor=2, max_depth=1)
     memory_manager = MemoryManager()
-    best = executor.run(task, base_agent, evolver, evaluator, judge, memory_manager)
+    try:
+        best = executor.run(task, base_agent, evolver, evaluator, judge, memory_manager)
+    finally:
+        memory_manager.close()
     print(f"Best version: {best.version}")
 
 
+def configure_logging():
+    """Log agent outputs and workflow progress at ``LOG_LEVEL`` (default INFO)."""
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+                        format="%(levelname)s %(name)s: %(message)s")
+
+
 def main():
+    configure_logging()
     user_prompt = "Build a web app for image classification"
     run_demo(user_prompt, interactive=False)
 
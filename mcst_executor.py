@@ -1,24 +1,177 @@
-import json
+import asyncio
+import hashlib
 import os
 from typing import List, Optional
 
+import json_utils
 from Agent import EvolvingAgent
 from memory_manager import MemoryManager
 
 
+class ScoreCache:
+    """Scores of already evaluated agents, keyed by their code, prompt and model.
+
+    Share one instance between executors to reuse scores across runs.
+    """
+
+    def __init__(self):
+        self._scores = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._scores)
+
+    @staticmethod
+    def key_for(agent) -> bytes:
+        """Digest of the agent's model, prompt and code."""
+        parts = (agent.model_config.get("model", ""), agent.prompt, agent.code)
+        return hashlib.blake2b("\x00".join(parts).encode(), digest_size=16).digest()
+
+    def get(self, key):
+        """Cached score for ``key``, or None; counts the hit or miss."""
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return score
+
+    def put(self, key, score):
+        """Store ``score`` under ``key``; None scores are not cached."""
+        if score is not None:
+            self._scores[key] = score
+
+
+def _is_deterministic(evaluator) -> bool:
+    """Evaluators sampling at a non-zero temperature are never cached."""
+    config = getattr(evaluator, "model_config", None) or {}
+    return not config.get("temperature", 0)
+
+
 class MCSTExecutor:
     """Simplified Monte Carlo Search Tree executor."""
 
-    def __init__(self, branching_factor: int = 2, max_depth: int = 2, work_dir: str = "evolution_runs"):
+    def __init__(self, branching_factor: int = 2, max_depth: int = 2, work_dir: str = "evolution_runs",
+                 score_cache: Optional[ScoreCache] = None):
         self.branching_factor = branching_factor
         self.max_depth = max_depth
         self.work_dir = work_dir
+        self.score_cache = score_cache if score_cache is not None else ScoreCache()
+
+    def _cached_score(self, evaluator, child):
+        """Return ``(key, score)``; ``score`` is None unless a cached score applies."""
+        if not _is_deterministic(evaluator):
+            return None, None
+        key = ScoreCache.key_for(child)
+        score = self.score_cache.get(key)
+        if score is not None:
+            child.metadata["score"] = score  # as evaluate() would have set it
+        return key, score
+
+    def _evaluate(self, evaluator, child):
+        key, score = self._cached_score(evaluator, child)
+        if score is None:
+            score = evaluator.evaluate(child)
+            if key is not None:
+                self.score_cache.put(key, score)
+        return score
+
+    def _evaluate_all(self, evaluator, children):
+        """Score ``children``, sending the cache misses to ``evaluate_batch`` in one call.
+
+        Evaluators without ``evaluate_batch``, whose batch call raises
+        AttributeError or NotImplementedError, or whose batch result does not
+        hold one number per child, are called child by child instead. Any
+        other error from the batch call propagates.
+        """
+        evaluate_batch = getattr(evaluator, "evaluate_batch", None)
+        if evaluate_batch is None:
+            return [self._evaluate(evaluator, child) for child in children]
+        cached = [self._cached_score(evaluator, child) for child in children]
+        missing = [i for i, (_, score) in enumerate(cached) if score is None]
+        if not missing:
+            return [score for _, score in cached]
+        try:
+            fresh = list(evaluate_batch([children[i] for i in missing]))
+        except (AttributeError, NotImplementedError):  # batching not supported
+            fresh = None
+        if fresh is None or len(fresh) != len(missing) or not all(
+                isinstance(score, (int, float)) for score in fresh):
+            fresh = [evaluator.evaluate(children[i]) for i in missing]
+        scores = [score for _, score in cached]
+        for i, score in zip(missing, fresh):
+            scores[i] = score
+            if cached[i][0] is not None:
+                self.score_cache.put(cached[i][0], score)
+        return scores
 
-    def _log(self, run_dir: str, data: dict):
+    async def _aevaluate_all(self, evaluator, children):
+        """Score ``children``, evaluating cache misses concurrently."""
+        aevaluate = getattr(evaluator, "aevaluate", None)
+        if aevaluate is None:
+            return [self._evaluate(evaluator, child) for child in children]
+        cached = [self._cached_score(evaluator, child) for child in children]
+        missing = [i for i, (_, score) in enumerate(cached) if score is None]
+        fresh = await asyncio.gather(*(aevaluate(children[i]) for i in missing))
+        scores = [score for _, score in cached]
+        for i, score in zip(missing, fresh):
+            scores[i] = score
+            if cached[i][0] is not None:
+                self.score_cache.put(cached[i][0], score)
+        return scores
+
+    @staticmethod
+    def _open_tree(run_dir: str, root_version: str):
+        """Start a run's tree log and return the handle its nodes are appended to.
+
+        ``tree.json`` only holds the root version and, under ``nodes_file``, the
+        name of ``tree.jsonl``; every node is one JSON line there, written as
+        soon as it is chosen.
+        """
         os.makedirs(run_dir, exist_ok=True)
-        log_file = os.path.join(run_dir, "tree.json")
-        with open(log_file, "w") as f:
-            json.dump(data, f, indent=2)
+        with open(os.path.join(run_dir, "tree.json"), "wb") as f:
+            f.write(json_utils.dumps({"root": root_version, "nodes_file": "tree.jsonl"}, indent=True))
+        nodes = open(os.path.join(run_dir, "tree.jsonl"), "wb")
+        MCSTExecutor._append_node(nodes, root_version, None, None)
+        return nodes
+
+    @staticmethod
+    def _append_node(nodes, version, parent, score):
+        nodes.write(json_utils.dumps({"version": version, "parent": parent, "score": score}) + b"\n")
+
+    @staticmethod
+    def _record_children(memory_manager, parent, results):
+        """Log each evaluated ``(child, score)`` pair in child order."""
+        if not memory_manager:
+            return
+        memory_manager.batch_add(
+            memory_manager.entry(
+                branch_id=child.version,
+                parent_id=parent.version,
+                code=child.code,
+                prompt=child.prompt,
+                tool=None,
+                score=result,
+                rationale="auto-generated",
+            )
+            for child, result in results
+        )
+
+    @staticmethod
+    def _finish(current_agent, memory_manager):
+        if memory_manager:
+            memory_manager.add_evolution(
+                branch_id=current_agent.version,
+                parent_id=current_agent.parent,
+                code=current_agent.code,
+                prompt=current_agent.prompt,
+                tool=None,
+                score=current_agent.metadata.get("score"),
+                rationale="final",
+            )
+            memory_manager.flush()  # the caller owns the manager and may keep using it
+        return current_agent
 
     def run(
         self,
@@ -31,39 +184,56 @@ class MCSTExecutor:
     ):
         """Run a toy MCST evolution loop."""
         run_dir = os.path.join(self.work_dir, task.description.replace(" ", "_"))
-        tree = {"root": initial_agent.version, "nodes": {initial_agent.version: {"parent": None}}}
+        nodes = self._open_tree(run_dir, initial_agent.version)
         current_agent = initial_agent
         depth = 0
-        while depth < self.max_depth:
-            # generate children via evolver
-            children: List[EvolvingAgent] = evolver.generate_mutations(current_agent, self.branching_factor)
-            results = []
-            for child in children:
-                result = evaluator.evaluate(child)
-                if memory_manager:
-                    memory_manager.add_evolution(
-                        branch_id=child.version,
-                        parent_id=current_agent.version,
-                        code=child.code,
-                        prompt=child.prompt,
-                        tool=None,
-                        score=result,
-                        rationale="auto-generated",
-                    )
-                results.append((child, result))
-            winner = judge.choose(results)
-            tree["nodes"][winner.version] = {"parent": current_agent.version, "score": winner.metadata.get("score")}
-            current_agent = winner
-            depth += 1
-        self._log(run_dir, tree)
-        if memory_manager:
-            memory_manager.add_evolution(
-                branch_id=current_agent.version,
-                parent_id=current_agent.parent,
-                code=current_agent.code,
-                prompt=current_agent.prompt,
-                tool=None,
-                score=current_agent.metadata.get("score"),
-                rationale="final",
-            )
-        return current_agent
+        try:
+            while depth < self.max_depth:
+                # generate children via evolver
+                children: List[EvolvingAgent] = evolver.generate_mutations(current_agent, self.branching_factor)
+                results = list(zip(children, self._evaluate_all(evaluator, children)))
+                self._record_children(memory_manager, current_agent, results)
+                winner = judge.choose(results)
+                self._append_node(nodes, winner.version, current_agent.version, winner.metadata.get("score"))
+                current_agent = winner
+                depth += 1
+            return self._finish(current_agent, memory_manager)
+        finally:
+            nodes.close()
+
+    async def arun(
+        self,
+        task,
+        initial_agent: EvolvingAgent,
+        evolver,
+        evaluator,
+        judge,
+        memory_manager: Optional[MemoryManager] = None,
+    ):
+        """Async variant of `run` that evaluates the children of each level concurrently.
+
+        Evolvers may provide ``agenerate_mutations`` and evaluators ``aevaluate``;
+        otherwise the sync methods are used. Judging and logging still happen in
+        child order once all scores are in.
+        """
+        agenerate_mutations = getattr(evolver, "agenerate_mutations", None)
+        run_dir = os.path.join(self.work_dir, task.description.replace(" ", "_"))
+        nodes = self._open_tree(run_dir, initial_agent.version)
+        current_agent = initial_agent
+        depth = 0
+        try:
+            while depth < self.max_depth:
+                if agenerate_mutations is not None:
+                    children: List[EvolvingAgent] = await agenerate_mutations(current_agent, self.branching_factor)
+                else:
+                    children = evolver.generate_mutations(current_agent, self.branching_factor)
+                scores = await self._aevaluate_all(evaluator, children)
+                results = list(zip(children, scores))
+                self._record_children(memory_manager, current_agent, results)
+                winner = judge.choose(results)
+                self._append_node(nodes, winner.version, current_agent.version, winner.metadata.get("score"))
+                current_agent = winner
+                depth += 1
+            return self._finish(current_agent, memory_manager)
+        finally:
+            nodes.close()
@@ -1,16 +1,132 @@
-import json
+import atexit
+import logging
 import os
+import queue
+import threading
+import weakref
+
+import json_utils
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Managers with a running writer; their queued entries are written out at exit
+_open_managers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all():
+    for manager in list(_open_managers):
+        manager.close()
+
 
 class MemoryManager:
-    def __init__(self, log_file="memory_log.json"):
+    """Evolution log stored as JSON Lines, one entry per line, appended in place.
+
+    When the log does not exist yet but a JSON array log from older versions
+    does next to it (``memory_log.json`` for the default ``memory_log.jsonl``),
+    its entries are imported into the new log first.
+
+    Writes are queued and appended by a background thread; call ``flush`` to
+    wait for them and ``close`` to stop the writer. A failed write is raised
+    from the next ``flush``. Entries added after ``close`` are written
+    synchronously, so a write error is raised from the call itself.
+    """
+
+    BATCH_SIZE = 256
+
+    def __init__(self, log_file="memory_log.jsonl"):
         self.log_file = log_file
         if not os.path.exists(self.log_file):
-            with open(self.log_file, "w") as f:
-                json.dump([], f)
+            self._create_log(os.path.splitext(self.log_file)[0] + ".json")
+        self._q = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+        self._error = None
 
-    def add_evolution(self, branch_id, parent_id, code, prompt, tool, score, rationale):
-        """Persist a single evolution step to the log file."""
-        entry = {
+    def _create_log(self, legacy_file):
+        """Create the log, seeded with the entries of ``legacy_file`` if that JSON array exists."""
+        entries = []
+        if legacy_file != self.log_file and os.path.exists(legacy_file):
+            with open(legacy_file, "rb") as f:
+                entries = json_utils.loads(f.read())
+            log.info("Importing %d memory entries from %s", len(entries), legacy_file)
+        with open(self.log_file, "wb") as f:
+            f.writelines(json_utils.dumps(entry) + b"\n" for entry in entries)
+
+    def _ensure_writer(self):
+        """Start the writer thread if it is not running; caller holds ``_writer_lock``."""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+            _open_managers.add(self)
+
+    def _write(self, lines):
+        with open(self.log_file, "ab", buffering=1 << 16) as f:
+            f.writelines(lines)
+
+    def _put(self, lines):
+        """Queue encoded lines for the writer thread, starting it if needed.
+
+        Once closed, no writer is started again: the lines are appended
+        directly after the entries queued before ``close``.
+        """
+        with self._writer_lock:
+            if not self._closed:
+                self._ensure_writer()
+                self._q.put(lines)
+                return
+        self._q.join()
+        with self._writer_lock:
+            self._write(lines)
+
+    def _writer_loop(self):
+        q = self._q
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.BATCH_SIZE and not q.empty():
+                batch.append(q.get_nowait())
+            lines = [line for item in batch if item is not _STOP for line in item]
+            try:
+                if lines:
+                    self._write(lines)
+            except Exception as e:
+                # Keep the thread alive for later batches; flush() reports the failure
+                log.error("Failed to write %d memory entries to %s: %s", len(lines), self.log_file, e)
+                self._error = e
+            finally:
+                for _ in batch:
+                    q.task_done()
+            if _STOP in batch:
+                return
+
+    def flush(self):
+        """Block until every queued entry has been written, raising the last write error if any."""
+        with self._writer_lock:
+            if not self._closed and not self._q.empty():
+                self._ensure_writer()
+        self._q.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Write the pending entries and stop the writer thread for good."""
+        with self._writer_lock:
+            self._closed = True
+            writer, self._writer = self._writer, None
+            _open_managers.discard(self)
+            if writer is None or not writer.is_alive():
+                return
+            self._q.put(_STOP)
+        writer.join()
+
+    @staticmethod
+    def entry(branch_id, parent_id, code, prompt, tool, score, rationale):
+        """Build a log entry dict in the shape ``add_evolution`` writes."""
+        return {
             "branch_id": branch_id,
             "parent_id": parent_id,
             "code": code,
@@ -19,8 +135,30 @@ class MemoryManager:
             "score": score,
             "rationale": rationale,
         }
-        with open(self.log_file, "r+") as f:
-            data = json.load(f)
-            data.append(entry)
-            f.seek(0)
-            json.dump(data, f, indent=2)
+
+    def add_evolution(self, branch_id, parent_id, code, prompt, tool, score, rationale):
+        """Persist a single evolution step to the log file."""
+        entry = self.entry(branch_id, parent_id, code, prompt, tool, score, rationale)
+        self._put((json_utils.dumps(entry) + b"\n",))
+
+    def batch_add(self, entries):
+        """Queue several entries (as built by ``entry``) to be written together."""
+        lines = [json_utils.dumps(entry) + b"\n" for entry in entries]
+        if lines:
+            self._put(lines)
+
+    def read_all(self):
+        """Yield the logged entries in the order they were written."""
+        self.flush()
+        with open(self.log_file, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield json_utils.loads(line)
+
+    def export_json(self, path=None):
+        """Return the whole log as a JSON array, also writing it to ``path`` if given."""
+        data = list(self.read_all())
+        if path is not None:
+            with open(path, "wb") as f:
+                f.write(json_utils.dumps(data, indent=True))
+        return data
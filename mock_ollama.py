@@ -1,5 +1,43 @@
-def chat(model, messages, stream=False, options=None):
+import hashlib
+
+
+def _chunks(content):
+    """Yield ``content`` word by word as streamed chat chunks."""
+    for token in content.split(" "):
+        yield {"message": {"content": token + " "}, "done": False}
+    yield {"message": {"content": ""}, "done": True}
+
+
+async def _achunks(content):
+    for chunk in _chunks(content):
+        yield chunk
+
+
+def chat(model, messages, stream=False, options=None, keep_alive=None):
     """Return a mock response mimicking `ollama.chat`."""
-    last_user = next((m['content'] for m in reversed(messages) if m.get('role') == 'user'), '')
-    content = f"MOCK RESPONSE: {last_user}"
+    # Agents put the user message last, so this usually stops at the first step
+    last_user = ''
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        if message.get('role') == 'user':
+            last_user = message['content']
+            break
+    content = "MOCK RESPONSE: " + last_user
+    if stream:
+        return _chunks(content)
     return {"message": {"content": content}}
+
+
+async def achat(model, messages, stream=False, options=None, keep_alive=None):
+    """Async counterpart of `chat` mimicking `ollama.AsyncClient.chat`."""
+    if stream:
+        return _achunks(chat(model, messages)["message"]["content"])
+    return chat(model, messages, stream=stream, options=options)
+
+
+def embeddings(model, prompt, options=None):
+    """Return a deterministic bag-of-words embedding mimicking `ollama.embeddings`."""
+    vector = [0.0] * 64
+    for word in prompt.lower().split():
+        vector[hashlib.md5(word.encode()).digest()[0] % 64] += 1.0
+    return {"embedding": vector}
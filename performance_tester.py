@@ -5,18 +5,20 @@ Tests system behavior under various load and edge conditions.
 """
 
 import os
+import sys
 import time
 import threading
 import tempfile
 import shutil
 from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
 import json
 
 # Set mock environment
 os.environ["MOCK_OLLAMA"] = "1"
 
-from Agent import LLMAgent, EvolvingAgent
+from Agent import LLMAgent, EvolvingAgent, aclose_async_clients
 from WorkflowManager import WorkflowManager
 from task import Task
 from mcst_executor import MCSTExecutor
@@ -27,9 +29,54 @@ from memory_manager import MemoryManager
 from main import build_workflow_manager
 
 
+def _run_concurrent_agent(agent_id, model_config):
+    """Run a single agent; module level so process pools can pickle it."""
+    agent = LLMAgent(
+        name=f"ConcurrentAgent{agent_id}",
+        model_config=model_config,
+        system="Concurrent test"
+    )
+    
+    results = []
+    for i in range(5):
+        result = agent.execute(f"Input {i}")
+        results.append(result)
+        time.sleep(0.01)  # Small delay to simulate work
+    
+    return len([r for r in results if r['success']])
+
+
+async def _arun_concurrent_agent(agent_id, model_config):
+    """Async variant of `_run_concurrent_agent` built on ``aexecute``."""
+    agent = LLMAgent(
+        name=f"ConcurrentAgent{agent_id}",
+        model_config=model_config,
+        system="Concurrent test"
+    )
+    
+    results = []
+    for i in range(5):
+        result = await agent.aexecute(f"Input {i}")
+        results.append(result)
+        await asyncio.sleep(0.01)  # Small delay to simulate work
+    
+    return len([r for r in results if r['success']])
+
+
+async def _gather_concurrent_agents(agent_count, model_config):
+    try:
+        counts = await asyncio.gather(*(_arun_concurrent_agent(i, model_config) for i in range(agent_count)))
+    finally:
+        await aclose_async_clients()
+    return sum(counts)
+
+
 class PerformanceTester:
     """Performance and stress testing suite."""
     
+    LONG_INPUT = "This is a very long input. " * 1000  # ~25KB input
+    RAPID_INPUTS = tuple(f"Rapid test {i}" for i in range(100))
+
     def __init__(self):
         self.results = {}
         self.temp_dir = tempfile.mkdtemp(prefix="perf_test_")
@@ -115,7 +162,7 @@ class PerformanceTester:
         evolver = EvolverAgent(name="evolver", model_config=model_config)
         evaluator = EvaluatorAgent()
         judge = JudgeAgent()
-        memory_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "perf_memory.json"))
+        memory_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "perf_memory.jsonl"))
         
         # Test MCST with different configurations
         configurations = [
@@ -133,7 +180,7 @@ class PerformanceTester:
                 branching_factor=config["branching_factor"],
                 max_depth=config["max_depth"],
                 work_dir=self.temp_dir
-            )
+            )  # fresh score cache, so each configuration is timed from a cold start
             
             best_agent = executor.run(task, initial_agent, evolver, evaluator, judge, memory_manager)
             
@@ -142,12 +189,14 @@ class PerformanceTester:
             result = {
                 'config': config,
                 'time_seconds': execution_time,
-                'final_version': best_agent.version
+                'final_version': best_agent.version,
+                'score_cache': {'hits': executor.score_cache.hits, 'misses': executor.score_cache.misses}
             }
             mcst_results.append(result)
             
             print(f"MCST {config} took {execution_time:.3f}s, final version: {best_agent.version}")
         
+        memory_manager.close()
         self.results['mcst_performance'] = mcst_results
     
     def test_concurrent_agents(self):
@@ -156,45 +205,40 @@ class PerformanceTester:
         
         model_config = {"model": "test", "temperature": 0.7}
         
-        def run_agent(agent_id):
-            """Run a single agent."""
-            agent = LLMAgent(
-                name=f"ConcurrentAgent{agent_id}",
-                model_config=model_config,
-                system="Concurrent test"
-            )
-            
-            results = []
-            for i in range(5):
-                result = agent.execute(f"Input {i}")
-                results.append(result)
-                time.sleep(0.01)  # Small delay to simulate work
-            
-            return len([r for r in results if r['success']])
+        def run_pool(executor_cls, worker_count):
+            with executor_cls(max_workers=worker_count) as executor:
+                futures = [executor.submit(_run_concurrent_agent, i, model_config)
+                           for i in range(worker_count * 2)]
+                return sum(f.result() for f in futures)
+        
+        # Threads share the GIL, processes do not; asyncio overlaps I/O on one thread
+        modes = {
+            'threads': lambda n: run_pool(ThreadPoolExecutor, n),
+            'processes': lambda n: run_pool(ProcessPoolExecutor, n),
+            'async': lambda n: asyncio.run(_gather_concurrent_agents(n * 2, model_config)),
+        }
         
         # Test with different thread counts
         thread_counts = [1, 2, 4, 8]
         concurrent_results = []
         
-        for thread_count in thread_counts:
-            start_time = time.time()
-            
-            with ThreadPoolExecutor(max_workers=thread_count) as executor:
-                futures = [executor.submit(run_agent, i) for i in range(thread_count * 2)]
-                successful_executions = sum(f.result() for f in futures)
-            
-            execution_time = time.time() - start_time
-            
-            result = {
-                'thread_count': thread_count,
-                'total_agents': thread_count * 2,
-                'successful_executions': successful_executions,
-                'time_seconds': execution_time
-            }
-            concurrent_results.append(result)
-            
-            print(f"Threads: {thread_count}, Agents: {thread_count * 2}, "
-                  f"Success: {successful_executions}, Time: {execution_time:.3f}s")
+        for mode, run in modes.items():
+            for thread_count in thread_counts:
+                start_time = time.time()
+                successful_executions = run(thread_count)
+                execution_time = time.time() - start_time
+                
+                result = {
+                    'mode': mode,
+                    'thread_count': thread_count,
+                    'total_agents': thread_count * 2,
+                    'successful_executions': successful_executions,
+                    'time_seconds': execution_time
+                }
+                concurrent_results.append(result)
+                
+                print(f"{mode.capitalize()}: {thread_count}, Agents: {thread_count * 2}, "
+                      f"Success: {successful_executions}, Time: {execution_time:.3f}s")
         
         self.results['concurrent_execution'] = concurrent_results
     
@@ -212,23 +256,28 @@ class PerformanceTester:
             import psutil
             process = psutil.Process()
             
+            agent_bytes = 0
             for i in range(0, 200, 10):
                 # Create 10 agents
                 for j in range(10):
+                    n = i + j
                     agent = EvolvingAgent(
-                        name=f"MemAgent{i+j}",
+                        name=f"MemAgent{n}",
                         model_config=model_config,
-                        prompt=f"Prompt {i+j}" * 10,  # Make it larger
-                        code=f"# Code {i+j}\n" * 20,
-                        version=f"v{i+j}_0"
+                        prompt=f"Prompt {n}" * 10,  # Make it larger
+                        code=f"# Code {n}\n" * 20,
+                        version=sys.intern(f"v{n}_0")  # versions are used as dict keys
                     )
                     agents.append(agent)
+                    agent_bytes += (sys.getsizeof(agent) + sys.getsizeof(agent.__dict__)
+                                    + sys.getsizeof(agent.prompt) + sys.getsizeof(agent.code))
                 
                 # Sample memory usage
                 memory_mb = process.memory_info().rss / 1024 / 1024
                 memory_samples.append({
                     'agent_count': len(agents),
-                    'memory_mb': memory_mb
+                    'memory_mb': memory_mb,
+                    'agent_bytes': agent_bytes
                 })
             
             self.results['memory_usage'] = {
@@ -238,7 +287,7 @@ class PerformanceTester:
             }
             
             print(f"Peak memory: {max(s['memory_mb'] for s in memory_samples):.1f} MB "
-                  f"with {len(agents)} agents")
+                  f"with {len(agents)} agents ({agent_bytes / 1024:.1f} KB in agent objects and texts)")
                   
         except ImportError:
             print("psutil not available, skipping memory test")
@@ -285,16 +334,32 @@ class PerformanceTester:
             loaded_agents.append(loaded_agent)
         load_time = time.time() - load_start
         
+        # Same agents through a single tar archive
+        archive_path = os.path.join(self.temp_dir, "agents.tar")
+        batch_save_start = time.time()
+        EvolvingAgent.save_many(agents, archive_path)
+        batch_save_time = time.time() - batch_save_start
+        
+        batch_load_start = time.time()
+        batch_loaded = EvolvingAgent.load_many(archive_path, model_config=model_config, system="Test")
+        batch_load_time = time.time() - batch_load_start
+        
         self.results['file_io'] = {
             'agents_tested': len(agents),
             'save_time_seconds': save_time,
             'load_time_seconds': load_time,
             'saves_per_second': len(agents) / save_time,
-            'loads_per_second': len(agents) / load_time
+            'loads_per_second': len(agents) / load_time,
+            'files_per_phase': 3 * len(agents),
+            'batch_save_time_seconds': batch_save_time,
+            'batch_load_time_seconds': batch_load_time,
+            'batch_files_per_phase': 1
         }
         
         print(f"Saved {len(agents)} agents in {save_time:.3f}s ({len(agents)/save_time:.1f}/sec)")
         print(f"Loaded {len(loaded_agents)} agents in {load_time:.3f}s ({len(loaded_agents)/load_time:.1f}/sec)")
+        print(f"Archive: saved in {batch_save_time:.3f}s, loaded {len(batch_loaded)} in {batch_load_time:.3f}s "
+              f"(1 file instead of {3 * len(agents)})")
     
     def test_stress_scenarios(self):
         """Test stress scenarios and edge cases."""
@@ -306,7 +371,7 @@ class PerformanceTester:
         
         # Test 1: Very long inputs
         agent = LLMAgent(name="StressAgent", model_config=model_config, system="Stress test")
-        long_input = "This is a very long input. " * 1000  # ~25KB input
+        long_input = self.LONG_INPUT
         
         start_time = time.time()
         result = agent.execute(long_input)
@@ -318,12 +383,10 @@ class PerformanceTester:
             'time_seconds': long_input_time
         }
         
-        # Test 2: Many rapid executions
+        # Test 2: Many rapid executions; inputs are built up front so only execute() is timed
+        execute = agent.execute
         rapid_start = time.time()
-        rapid_results = []
-        for i in range(100):
-            result = agent.execute(f"Rapid test {i}")
-            rapid_results.append(result['success'])
+        rapid_results = [execute(rapid_input)['success'] for rapid_input in self.RAPID_INPUTS]
         rapid_time = time.time() - rapid_start
         
         stress_results['rapid_execution'] = {
@@ -343,12 +406,13 @@ class PerformanceTester:
             evolver = EvolverAgent(name="evolver", model_config=model_config)
             evaluator = EvaluatorAgent()
             judge = JudgeAgent()
-            memory_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "stress_memory.json"))
+            memory_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "stress_memory.jsonl"))
             
             deep_start = time.time()
             executor = MCSTExecutor(branching_factor=3, max_depth=4, work_dir=self.temp_dir)
             best_agent = executor.run(task, initial_agent, evolver, evaluator, judge, memory_manager)
             deep_time = time.time() - deep_start
+            memory_manager.close()
             
             stress_results['deep_mcst'] = {
                 'max_depth': 4,
@@ -367,7 +431,7 @@ class PerformanceTester:
         self.results['stress_scenarios'] = stress_results
         
         print(f"Long input ({len(long_input)} chars): {long_input_time:.3f}s")
-        print(f"Rapid execution (100 calls): {rapid_time:.3f}s ({len(rapid_results)/rapid_time:.1f}/sec)")
+        print(f"Rapid execution ({len(rapid_results)} calls): {rapid_time:.3f}s ({len(rapid_results)/rapid_time:.1f}/sec)")
     
     def run_all_tests(self):
         """Run all performance tests."""
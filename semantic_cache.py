@@ -0,0 +1,50 @@
+"""Near-duplicate prompt cache for LLM agents, matched by embedding similarity."""
+
+import math
+import operator
+
+
+class SemanticCache:
+    """Serves stored LLM outputs for prompts whose embeddings are near-duplicates.
+
+    At most ``max_entries`` outputs are kept; the least recently matched or
+    added one is evicted first. Lookups compare against every stored vector,
+    so the bound also caps their cost.
+    """
+
+    def __init__(self, embed_fn, threshold=0.93, max_entries=256):
+        """Create an empty cache using ``embed_fn(text) -> list[float]``."""
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = []  # [vector, output] pairs, least recently used first
+
+    def __len__(self):
+        """Number of stored outputs."""
+        return len(self._entries)
+
+    def embed(self, text):
+        """Return the unit-length embedding of ``text``."""
+        vector = self.embed_fn(text)
+        norm = math.sqrt(sum(map(operator.mul, vector, vector)))
+        return [x / norm for x in vector] if norm else list(vector)
+
+    def lookup(self, vector):
+        """Return the most similar stored output, or None if none reaches the threshold."""
+        best, best_sim = None, self.threshold
+        mul = operator.mul
+        for i, (stored, _) in enumerate(self._entries):
+            sim = sum(map(mul, stored, vector))
+            if sim >= best_sim:
+                best, best_sim = i, sim
+        if best is None:
+            return None
+        entry = self._entries.pop(best)
+        self._entries.append(entry)
+        return entry[1]
+
+    def add(self, vector, output):
+        """Store ``output`` under an embedding produced by `embed`, evicting the oldest if full."""
+        self._entries.append([vector, output])
+        if len(self._entries) > self.max_entries:
+            del self._entries[0]
@@ -5,11 +5,53 @@ Simple Documentation Checker for Agent Workflow Project
 
 import os
 import re
+import sys
 import ast
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from typing import List
 
-def check_documentation():
-    """Check documentation completeness and accuracy."""
+PYTHON_BLOCK_RE = re.compile(r'```python\n(.*?)```', re.DOTALL)
+
+
+@lru_cache(maxsize=None)
+def _parse(path, mtime):
+    """Parse a Python file; ``mtime`` is part of the cache key so edits are picked up."""
+    with open(path, 'r') as f:
+        return ast.parse(f.read())
+
+
+def _check_one_file(file_path):
+    """Return the docstring issues of one Python file."""
+    issues = []
+    if os.path.exists(file_path):
+        try:
+            tree = _parse(file_path, os.path.getmtime(file_path))
+
+            # Check the module docstring and count classes and functions
+            # without docstrings in one pass (the module is walked first)
+            missing_docstrings = 0
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+                    if not node.name.startswith('_') and not ast.get_docstring(node):
+                        missing_docstrings += 1
+                elif node is tree and not ast.get_docstring(tree):
+                    issues.append(f"{file_path} missing module docstring")
+
+            if missing_docstrings > 0:
+                issues.append(f"{file_path} has {missing_docstrings} classes/functions without docstrings")
+
+        except Exception as e:
+            issues.append(f"Error parsing {file_path}: {str(e)}")
+    else:
+        issues.append(f"Key file {file_path} is missing")
+    return issues
+
+def check_documentation(processes=False):
+    """Check documentation completeness and accuracy.
+
+    Python files are scanned on a thread pool, or a process pool if ``processes``.
+    """
     issues = []
     
     # Check README.md
@@ -27,7 +69,7 @@ def check_documentation():
             issues.append(f"README missing sections: {', '.join(missing_sections)}")
         
         # Check code examples syntax
-        code_blocks = re.findall(r'```python\n(.*?)```', readme_content, re.DOTALL)
+        code_blocks = PYTHON_BLOCK_RE.findall(readme_content)
         for i, code_block in enumerate(code_blocks):
             try:
                 ast.parse(code_block)
@@ -50,33 +92,12 @@ def check_documentation():
     else:
         issues.append("design_document.md is missing")
     
-    # Check Python files for docstrings
+    # Check Python files for docstrings; files are independent, so scan them concurrently
     python_files = ['Agent.py', 'WorkflowManager.py', 'main.py', 'task.py', 'mcst_executor.py']
-    for file_path in python_files:
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                tree = ast.parse(content)
-                
-                # Check module docstring
-                if not ast.get_docstring(tree):
-                    issues.append(f"{file_path} missing module docstring")
-                
-                # Count classes and functions without docstrings
-                missing_docstrings = 0
-                for node in ast.walk(tree):
-                    if isinstance(node, (ast.ClassDef, ast.FunctionDef)):
-                        if not node.name.startswith('_') and not ast.get_docstring(node):
-                            missing_docstrings += 1
-                
-                if missing_docstrings > 0:
-                    issues.append(f"{file_path} has {missing_docstrings} classes/functions without docstrings")
-                    
-            except Exception as e:
-                issues.append(f"Error parsing {file_path}: {str(e)}")
-        else:
-            issues.append(f"Key file {file_path} is missing")
+    executor_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_cls(max_workers=min(8, len(python_files))) as ex:
+        for file_issues in ex.map(_check_one_file, python_files):
+            issues.extend(file_issues)
     
     # Check file structure
     expected_files = ['requirements.txt', 'tools/', 'LICENSE']
@@ -91,7 +112,7 @@ def main():
     print("Documentation Validation Report")
     print("=" * 40)
     
-    issues = check_documentation()
+    issues = check_documentation(processes="--processes" in sys.argv[1:])
     
     if not issues:
         print("✓ All documentation checks passed!")
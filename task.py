@@ -2,7 +2,10 @@ import json
 from dataclasses import dataclass, field
 from typing import List
 
-@dataclass
+import json_utils
+
+
+@dataclass(slots=True)
 class Task:
     """Represents a single executable task."""
 
@@ -26,9 +29,10 @@ class Task:
         }
 
     def to_json(self):
+        # stdlib json keeps the ASCII-escaped format already written to disk
         return json.dumps(self.to_dict(), indent=2)
 
     @classmethod
     def from_json(cls, data: str):
-        obj = json.loads(data)
+        obj = json_utils.loads(data)
         return cls(**obj)
@@ -1,20 +1,131 @@
+import asyncio
+import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+TOOL_POOL_WORKERS = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _tool_pool():
+    """Thread pool shared by every ToolManager, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=TOOL_POOL_WORKERS, thread_name_prefix="tool")
+        return _pool
+
+
 class ToolManager:
-    """Registry and executor for tools."""
+    """Registry and executor for tools.
+
+    Results of tools registered as ``cacheable`` are kept in an LRU keyed on
+    the call arguments; leave side-effectful tools uncached.
+    """
+
+    cache_size = 512
 
     def __init__(self):
         self._tools = {}
+        self._cacheable = set()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
 
-    def register(self, name, func):
+    def register(self, name, func, cacheable=False):
         """Register a tool function by name."""
         self._tools[name] = func
+        if cacheable:
+            self._cacheable.add(name)
+        else:
+            self._cacheable.discard(name)
+        with self._cache_lock:
+            for key in [key for key in self._cache if key[0] == name]:
+                del self._cache[key]
+
+    def get(self, name):
+        """Return the tool function registered as ``name``, bypassing the result cache.
+
+        Lets callers that invoke a tool many times resolve it once.
+        """
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise ValueError(f"Tool '{name}' not registered") from None
+
+    def __getitem__(self, name):
+        """Mapping-style access to a tool function; raises KeyError if not registered."""
+        return self._tools[name]
 
     def run(self, name, *args, **kwargs):
-        if name not in self._tools:
-            raise ValueError(f"Tool '{name}' not registered")
-        return self._tools[name](*args, **kwargs)
+        func = self.get(name)
+        if name not in self._cacheable:
+            return func(*args, **kwargs)
+        key = (name, args, frozenset(kwargs.items()))
+        try:
+            with self._cache_lock:
+                result = self._cache[key]
+                self._cache.move_to_end(key)
+            return result
+        except KeyError:
+            pass
+        except TypeError:  # unhashable arguments
+            return func(*args, **kwargs)
+        result = func(*args, **kwargs)
+        with self._cache_lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
 
     def run_sequence(self, tools, input_data=None):
         data = input_data
         for name in tools:
             data = self.run(name, data)
         return data
+
+    def run_parallel(self, tools, input_data=None, timeout=None):
+        """Run independent tools on the same input concurrently.
+
+        Results come back in ``tools`` order. With a ``timeout``, tools still
+        running when it expires are left to finish in the background and
+        report None.
+        """
+        for name in tools:
+            self.get(name)  # fail before anything is submitted
+        pool = _tool_pool()
+        futures = [pool.submit(self.run, name, input_data) for name in tools]
+        done, _ = wait(futures, timeout=timeout)
+        return [future.result() if future in done else None for future in futures]
+
+
+class AsyncToolManager:
+    """Async twin of `ToolManager`; sync tools run in a worker thread."""
+
+    def __init__(self):
+        self._tools = {}
+
+    def register(self, name, func):
+        """Register a tool function or coroutine function by name."""
+        self._tools[name] = func
+
+    async def run(self, name, *args, **kwargs):
+        try:
+            func = self._tools[name]
+        except KeyError:
+            raise ValueError(f"Tool '{name}' not registered") from None
+        if inspect.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def run_sequence(self, tools, input_data=None):
+        data = input_data
+        for name in tools:
+            data = await self.run(name, data)
+        return data
+
+    async def run_parallel(self, tools, input_data=None):
+        """Run independent tools on the same input concurrently, results in ``tools`` order."""
+        return list(await asyncio.gather(*(self.run(name, input_data) for name in tools)))
@@ -1,10 +1,187 @@
+import contextlib
+import io
+import os
+import signal
 import subprocess
+import sys
+import tempfile
+import threading
+import traceback
+from functools import lru_cache
 
-def run(code: str):
+# redirect_stdout swaps the process-wide sys.stdout, so in-process runs take turns
+_exec_lock = threading.Lock()
+
+
+@lru_cache(maxsize=128)
+def _compile(code: str):
+    return compile(code, "<tool>", "exec")
+
+
+def _exec_snippet(code: str) -> bool:
+    """Run ``code`` in a fresh namespace like ``python -c`` would; return whether it succeeded."""
+    try:
+        exec(_compile(code), {"__name__": "__main__"})
+    except SystemExit as e:
+        if e.code is None or e.code == 0:
+            return True
+        # Like the interpreter, only non-integer exit codes are printed
+        if not isinstance(e.code, int):
+            print(e.code, file=sys.stderr)
+        return False
+    except Exception as e:
+        # Drop this module's frames so the traceback starts at the snippet
+        tb = None if isinstance(e, SyntaxError) else e.__traceback__.tb_next
+        traceback.print_exception(type(e), e, tb)
+        return False
+    return True
+
+
+def _run_in_process(code: str):
+    buf = io.StringIO()
+    with _exec_lock, contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+        ok = _exec_snippet(code)
+    return ok, buf.getvalue()
+
+
+def _run_captured(code: str):
+    """Run ``code`` with fds 1 and 2 pointed at a temp file, so output from child processes is kept."""
+    with tempfile.TemporaryFile() as out:
+        saved = os.dup(1), os.dup(2)
+        os.dup2(out.fileno(), 1)
+        os.dup2(out.fileno(), 2)
+        try:
+            ok = _exec_snippet(code)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+        out.seek(0)
+        return ok, out.read().decode(errors="replace")
+
+
+# Long-lived worker for isolated runs; started on first use, replaced if it dies or times out
+_worker = None
+_worker_lock = threading.Lock()
+
+# Seconds an isolated snippet may run before its worker is killed
+DEFAULT_TIMEOUT = 30.0
+
+
+def _run_forked(code: str):
+    """Run ``code`` in a forked child so no state outlives the snippet."""
+    with tempfile.TemporaryFile() as out:
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                null = os.open(os.devnull, os.O_RDONLY)
+                os.dup2(null, 0)  # keep the snippet off the protocol pipe
+                os.dup2(out.fileno(), 1)
+                os.dup2(out.fileno(), 2)
+                status = 0 if _exec_snippet(code) else 1
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        out.seek(0)
+        return os.waitstatus_to_exitcode(status) == 0, out.read().decode(errors="replace")
+
+
+def _serve():
+    """Worker loop: read length-prefixed snippets from stdin, answer ``b"<ok> <len>\\n" + output``.
+
+    Each snippet runs in a fresh child forked from this process. Without
+    ``fork`` the worker runs one snippet and exits, so the next call gets a
+    new interpreter either way.
+    """
+    # Keep the real stdout for the protocol; anything written to fd 1 goes to stderr
+    proto = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    stdin = sys.stdin.buffer
+    forking = hasattr(os, "fork")
+    while True:
+        header = stdin.readline()
+        if not header:
+            return
+        code = stdin.read(int(header)).decode()
+        ok, out = (_run_forked if forking else _run_captured)(code)
+        payload = out.encode()
+        proto.write(b"%d %d\n" % (ok, len(payload)) + payload)
+        proto.flush()
+        if not forking:
+            return
+
+
+def _kill_worker(worker):
+    """Kill ``worker`` together with any snippet process it forked."""
     try:
-        res = subprocess.check_output(['python', '-c', code], stderr=subprocess.STDOUT, text=True)
+        if os.name == "posix":
+            os.killpg(worker.pid, signal.SIGKILL)
+        else:
+            worker.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _run_isolated(code: str, timeout: float = DEFAULT_TIMEOUT):
+    global _worker
+    payload = code.encode()
+    with _worker_lock:
+        if _worker is None or _worker.poll() is not None:
+            _worker = subprocess.Popen([sys.executable, "-u", os.path.abspath(__file__)],
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       start_new_session=os.name == "posix")
+        worker = _worker
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            _kill_worker(worker)
+
+        timer = threading.Timer(timeout, expire) if timeout else None
+        if timer is not None:
+            timer.start()
+        try:
+            worker.stdin.write(b"%d\n" % len(payload) + payload)
+            worker.stdin.flush()
+            ok, size = worker.stdout.readline().split()
+            return ok == b"1", worker.stdout.read(int(size)).decode()
+        except (OSError, ValueError):
+            # The snippet took the worker down or ran too long; the next call starts a new one
+            _kill_worker(worker)
+            worker.wait()
+            worker.stdin.close()
+            worker.stdout.close()
+            _worker = None
+            if timed_out.is_set():
+                return False, f"Execution timed out after {timeout}s\n"
+            return False, "Execution worker exited unexpectedly\n"
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+
+def run(code: str, trusted: bool = False, timeout: float = DEFAULT_TIMEOUT):
+    """Execute ``code`` and return its combined stdout/stderr.
+
+    Snippets run in a fresh process forked from a separate worker interpreter
+    and are killed after ``timeout`` seconds (``None`` to wait forever). Pass ``trusted=True`` only
+    for code you control to exec it in this process instead: it is faster, but
+    the snippet shares this interpreter and output written straight to file
+    descriptors (e.g. by ``os.system``) is not captured.
+    """
+    ok, res = _run_in_process(code) if trusted else _run_isolated(code, timeout)
+    if ok:
         print(f"TOOL exec -> {res.strip()}")
-        return res
-    except subprocess.CalledProcessError as e:
-        print(f"Execution failed: {e.output}")
-        return e.output
+    else:
+        print(f"Execution failed: {res}")
+    return res
+
+
+if __name__ == "__main__":
+    _serve()
@@ -1,33 +1,124 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
-from main import build_workflow_manager
+from Agent import aclose_async_clients
+from main import build_workflow_manager, configure_logging
+
+configure_logging()  # agent outputs go to the console
+
+
+def get_manager():
+    """Return this browser session's workflow manager, building it on first use.
+
+    Agents keep per-run state (retry counts, input buffers, caches), so each
+    session gets its own manager in ``st.session_state`` instead of sharing one
+    through ``st.cache_resource``; the Ollama clients are already shared at
+    module level. The agents the UI drives are bound as attributes so reruns
+    skip the lookups.
+    """
+    manager = st.session_state.get('manager')
+    if manager is None:
+        manager = build_workflow_manager()
+        manager.clarifier = manager.agents['Clarifier']
+        manager.designer = manager.agents['Designer']
+        manager.taskmaker = manager.agents['TaskMaker']
+        st.session_state.manager = manager
+    return manager
+
+
+async def run_workflow(manager, start_agent_name, input_data):
+    """Run the workflow on a fresh event loop, closing its Ollama client at the end."""
+    try:
+        return await manager.arun_workflow(start_agent_name, input_data)
+    finally:
+        await aclose_async_clients()
+
 
-manager = build_workflow_manager()
+@st.cache_resource
+def get_executor():
+    """Worker threads that run workflows while the script keeps rerunning."""
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def throttled_writer(placeholder, interval=0.1):
+    """Token callback that redraws ``placeholder`` at most every ``interval`` seconds."""
+    parts = []
+    last_draw = [0.0]
+
+    def write(token):
+        parts.append(token)
+        now = time.monotonic()
+        if now - last_draw[0] >= interval:
+            placeholder.markdown("".join(parts))
+            last_draw[0] = now
+
+    return write
+
+
+manager = get_manager()
 
 st.title("Agent Workflow Demo")
 
-if 'stage' not in st.session_state:
-    st.session_state.stage = 'prompt'
-    st.session_state.prompt = ''
-    st.session_state.answer = ''
-    st.session_state.log = []
+LOG_SIZE = 200  # entries kept in the session log
+LOG_SHOWN = 20  # most recent entries rendered on each rerun
+
+for key, default in (('stage', 'prompt'), ('request', '')):
+    st.session_state.setdefault(key, default)
+if 'log' not in st.session_state:
+    st.session_state.log = deque(maxlen=LOG_SIZE)
 
 if st.session_state.stage == 'prompt':
-    st.session_state.prompt = st.text_input('Enter your request:')
-    if st.button('Start') and st.session_state.prompt:
-        clarifier = manager.agents['Clarifier']
-        res = clarifier.run_with_retries(st.session_state.prompt)
+    # Keyed widgets write straight into session_state; the form only reruns on submit
+    with st.form('prompt_form'):
+        st.text_input('Enter your request:', key='prompt')
+        submitted = st.form_submit_button('Start')
+    if submitted and st.session_state.prompt:
+        # Widget state is dropped once the widget stops rendering, so keep the request
+        st.session_state.request = st.session_state.prompt
+        placeholder = st.empty()
+        res = manager.clarifier.run_with_retries(st.session_state.request,
+                                         streaming_callback=throttled_writer(placeholder))
+        placeholder.markdown(res['output'] or '')
         st.session_state.log.append(('Clarifier', res['output']))
         st.session_state.clarifier_question = res['output']
         st.session_state.stage = 'clarifier'
 
 elif st.session_state.stage == 'clarifier':
     st.write('Clarifier asks:', st.session_state.clarifier_question)
-    st.session_state.answer = st.text_input('Your answer:')
-    if st.button('Continue') and st.session_state.answer:
-        clarified = f"{st.session_state.prompt} | {st.session_state.answer}"
-        manager.run_workflow('Designer', clarified)
+    with st.form('answer_form'):
+        st.text_input('Your answer:', key='answer')
+        submitted = st.form_submit_button('Continue')
+    if submitted and st.session_state.answer:
+        clarified = f"{st.session_state.request} | {st.session_state.answer}"
+        # Run in the background (async, so agents ready at the same step overlap
+        # their Ollama calls) and poll for completion on the following reruns.
+        # Only this session's agents are used, and at most one run is in flight
+        # per session, so nothing else touches them until it finishes.
+        future = st.session_state.get('future')
+        if future is None or future.done():
+            st.session_state.future = get_executor().submit(
+                asyncio.run, run_workflow(manager, manager.designer.name, clarified))
+        st.session_state.stage = 'running'
+
+if st.session_state.stage == 'running':
+    future = st.session_state.future
+    if future.done():
+        future.result()  # surface errors from the workflow
         st.session_state.stage = 'done'
+    else:
+        st.info('Working…')
+        time.sleep(0.5)
+        st.rerun()
 
 if st.session_state.stage == 'done':
     st.write('Workflow complete. See console for details.')
 
+if st.session_state.log:
+    with st.expander('History'):
+        log = st.session_state.log
+        for agent_name, output in itertools.islice(log, max(0, len(log) - LOG_SHOWN), None):
+            st.write(f"**{agent_name}:** {output}")
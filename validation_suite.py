@@ -4,80 +4,212 @@ Comprehensive Validation Suite for Agent Workflow Project
 Performs systematic testing of all components, features, and functionalities.
 """
 
+import asyncio
+import contextlib
+import io
+import itertools
 import os
+import socket
 import sys
-import json
 import traceback
 import tempfile
+import threading
+import time
 import shutil
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from importlib import import_module
 from typing import List, Dict, Any, Tuple
 from datetime import datetime
 
 # Set up mock environment for testing
 os.environ["MOCK_OLLAMA"] = "1"
 
-# Import project modules
+# Import the core project modules; helpers only one test needs (main, assignment,
+# mock_ollama) and the process pool are loaded on first use
 try:
     from Agent import LLMAgent, EvolvingAgent
     from WorkflowManager import WorkflowManager
     from task import Task
-    from tool_manager import ToolManager
+    from tool_manager import AsyncToolManager, ToolManager
     from mcst_executor import MCSTExecutor
     from evolver import EvolverAgent
     from evaluator import EvaluatorAgent
     from judge import JudgeAgent
-    from assignment import assign_agents_and_tools
     from memory_manager import MemoryManager
-    from main import build_workflow_manager, run_demo
-    import mock_ollama
+    import json_utils
 except ImportError as e:
     print(f"Failed to import project modules: {e}")
     sys.exit(1)
 
 
+@lru_cache(maxsize=None)
+def cached_import(module_name: str, item_name: str):
+    """Import ``module_name`` if needed and return its ``item_name`` attribute, memoized."""
+    module = sys.modules.get(module_name) or import_module(module_name)
+    return getattr(module, item_name)
+
+
+# build_workflow_manager() results, keyed on the MOCK_OLLAMA mode they were built under
+_wf_cache = {}
+
+
+def build_workflow_manager_cached():
+    """Return a workflow manager built once per process (and MOCK_OLLAMA setting)."""
+    key = os.environ.get("MOCK_OLLAMA", "0")
+    manager = _wf_cache.get(key)
+    if manager is None:
+        manager = _wf_cache[key] = cached_import("main", "build_workflow_manager")()
+    return manager
+
+
+# Lazily imported names, loaded before forking parallel workers
+_PRELOAD = (
+    ("tools.echo_tool", "run"),
+    ("tools.uppercase_tool", "run"),
+    ("tools.code_executor_tool", "run"),
+    ("main", "build_workflow_manager"),
+    ("assignment", "assign_agents_and_tools"),
+    ("mock_ollama", "chat"),
+)
+
+
+@contextlib.contextmanager
+def patch_agent_module(**replacements):
+    """Temporarily replace module-level names (e.g. ``ollama_chat``) in Agent.py."""
+    module = sys.modules[LLMAgent.__module__]
+    saved = {name: getattr(module, name) for name in replacements}
+    for name, value in replacements.items():
+        setattr(module, name, value)
+    try:
+        yield module
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def counting_chat(calls):
+    """Mock chat that records the keyword arguments of every call in ``calls``."""
+    chat = cached_import("mock_ollama", "chat")
+    def counted(**kwargs):
+        calls.append(kwargs)
+        return chat(**kwargs)
+    return counted
+
+
+# Complete model config for LLMAgent tests that reach the (mock) chat call
+AGENT_MODEL_CONFIG = {
+    "model": "llama3.2:latest",
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "frequency_penalty": 0.0,
+    "presence_penalty": 0.0,
+}
+
+
+@lru_cache(maxsize=None)
+def mcst_stack():
+    """Evolver, evaluator and judge shared by the MCST tests; none of them keep state."""
+    model_config = {"model": "test", "temperature": 0.7}
+    return {
+        "model_config": model_config,
+        "evolver": EvolverAgent(name="evolver", model_config=model_config),
+        "evaluator": EvaluatorAgent(),
+        "judge": JudgeAgent(),
+    }
+
+
+@dataclass(slots=True)
 class ValidationResult:
     """Container for validation test results."""
     
-    def __init__(self, test_name: str, passed: bool, message: str = "", details: Dict = None):
-        self.test_name = test_name
-        self.passed = passed
-        self.message = message
-        self.details = details or {}
-        self.timestamp = datetime.now().isoformat()
+    test_name: str
+    passed: bool
+    message: str = ""
+    details: Dict = field(default_factory=dict)
+    timestamp_ns: int = field(default_factory=time.time_ns)
+    
+    @property
+    def timestamp(self) -> str:
+        """ISO-formatted wall-clock time the result was recorded."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9).isoformat()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Report entry for this result."""
+        return {
+            "test_name": self.test_name,
+            "passed": self.passed,
+            "message": self.message,
+            "details": self.details,
+            "timestamp": self.timestamp,
+        }
 
 
 class ValidationSuite:
     """Comprehensive validation suite for the Agent Workflow project."""
     
-    def __init__(self):
+    def __init__(self, stream_path: str = None):
         self.results: List[ValidationResult] = []
+        self.passed_count = 0
         self.temp_dir = None
+        self._cleanups: List[threading.Thread] = []
+        # Results are also appended here as JSON lines as soon as they are recorded
+        self._stream = open(stream_path, "wb") if stream_path else None
         
     def setUp(self):
-        """Set up test environment."""
+        """Create a fresh temp dir for the next test."""
         self.temp_dir = tempfile.mkdtemp(prefix="agent_workflow_test_")
         os.makedirs(os.path.join(self.temp_dir, "evolution_runs"), exist_ok=True)
         
     def tearDown(self):
-        """Clean up test environment."""
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
+        """Remove the current test's temp dir in the background."""
+        if self.temp_dir:
+            cleanup = threading.Thread(target=shutil.rmtree, args=(self.temp_dir,),
+                                       kwargs={"ignore_errors": True})
+            cleanup.start()
+            self._cleanups.append(cleanup)
+        self.temp_dir = None
+    
+    def wait_for_cleanup(self):
+        """Block until every temp dir removed by ``tearDown`` is gone."""
+        while self._cleanups:
+            self._cleanups.pop().join()
             
     def add_result(self, test_name: str, passed: bool, message: str = "", details: Dict = None):
         """Add a test result."""
-        result = ValidationResult(test_name, passed, message, details)
-        self.results.append(result)
+        result = ValidationResult(test_name, passed, message, details or {})
+        self._record(result)
         status = "PASS" if passed else "FAIL"
         print(f"[{status}] {test_name}: {message}")
         
+    def _record(self, result: ValidationResult):
+        """Store a result, update the pass count and stream it out."""
+        self.results.append(result)
+        self.passed_count += result.passed
+        if self._stream is not None:
+            self._stream.write(json_utils.dumps(result.to_dict()) + b"\n")
+            self._stream.flush()
+    
+    def close(self):
+        """Close the result stream, if any."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+    
     def run_test(self, test_func, test_name: str):
-        """Run a single test with exception handling."""
+        """Run a single test in its own temp dir, with exception handling."""
+        self.setUp()
         try:
             test_func()
-            self.add_result(test_name, True, "Test completed successfully")
         except Exception as e:
-            self.add_result(test_name, False, f"Test failed with exception: {str(e)}", 
-                          {"traceback": traceback.format_exc()})
+            # Only failures pay for formatting a traceback
+            tb = traceback.TracebackException.from_exception(e)
+            self.add_result(test_name, False, f"Test failed with exception: {e}",
+                            {"traceback": "".join(tb.format())})
+        else:
+            self.add_result(test_name, True, "Test completed successfully")
+        finally:
+            self.tearDown()
     
     def test_imports_and_dependencies(self):
         """Test 1: Verify all imports work correctly."""
@@ -89,9 +221,9 @@ class ValidationSuite:
             assert Task is not None
             
             # Test tool imports
-            from tools.echo_tool import run as echo
-            from tools.uppercase_tool import run as upper
-            from tools.code_executor_tool import run as exec_tool
+            echo = cached_import("tools.echo_tool", "run")
+            upper = cached_import("tools.uppercase_tool", "run")
+            exec_tool = cached_import("tools.code_executor_tool", "run")
             assert echo is not None
             assert upper is not None
             assert exec_tool is not None
@@ -153,9 +285,8 @@ class ValidationSuite:
         
         agent.save(agent_path, prompt_path, metadata_path)
         
-        assert os.path.exists(agent_path)
-        assert os.path.exists(prompt_path)
-        assert os.path.exists(metadata_path)
+        found = {entry.name for entry in os.scandir(self.temp_dir)}
+        assert {"test_agent.py", "test_prompt.txt", "test_metadata.json"} <= found
         
         # Test loading
         loaded_agent = EvolvingAgent.load(
@@ -167,6 +298,16 @@ class ValidationSuite:
         assert loaded_agent.prompt == agent.prompt
         assert loaded_agent.version == agent.version
         
+        # Invalid code is rejected before anything is written
+        broken = EvolvingAgent(name="Broken", model_config=model_config, code="def broken(:")
+        broken_path = os.path.join(self.temp_dir, "broken_agent.py")
+        try:
+            broken.save(broken_path, os.path.join(self.temp_dir, "broken_prompt.txt"))
+            assert False, "Should have raised SyntaxError"
+        except SyntaxError:
+            assert broken.metadata["valid"] is False
+        assert not os.path.exists(broken_path)
+        
         self.add_result("Evolving Agent", True, "EvolvingAgent save/load functionality works correctly")
     
     def test_workflow_manager(self):
@@ -183,16 +324,32 @@ class ValidationSuite:
         
         assert "Agent1" in manager.agents
         assert "Agent2" in manager.agents
-        assert manager.connections["Agent1"] == ["Agent2"]
-        assert manager.connections["Agent2"] == []
+        assert manager.connections["Agent1"] == ("Agent2",)
+        assert manager.connections["Agent2"] == ()
+        
+        # Agents placed in the agents dict directly can still be run
+        manager.agents["Agent3"] = LLMAgent(name="Agent3", system="Agent 3", model_config={
+            **model_config, "top_p": 0.9, "frequency_penalty": 0.0, "presence_penalty": 0.0})
+        manager.connections["Agent3"] = ()
+        manager.run_workflow(start_agent_name="Agent3", input_data="test input")
+        
+        # arun_workflow honours subclasses that only override execute
+        seen = []
+        class RecordingAgent(LLMAgent):
+            def execute(self, user_input, on_token=None):
+                seen.append(user_input)
+                return {"output": user_input, "success": True}
+        manager.add_agent(RecordingAgent(name="Recorder", model_config=model_config))
+        asyncio.run(manager.arun_workflow("Recorder", "test input"))
+        assert seen == ["test input"]
         
         self.add_result("Workflow Manager", True, "WorkflowManager agent registration works correctly")
     
     def test_tools(self):
         """Test 5: Test tool functionality."""
-        from tools.echo_tool import run as echo
-        from tools.uppercase_tool import run as upper
-        from tools.code_executor_tool import run as exec_tool
+        echo = cached_import("tools.echo_tool", "run")
+        upper = cached_import("tools.uppercase_tool", "run")
+        exec_tool = cached_import("tools.code_executor_tool", "run")
         
         # Test echo tool
         result = echo("test input")
@@ -213,19 +370,36 @@ class ValidationSuite:
         tool_manager = ToolManager()
         
         # Register tools
-        tool_manager.register("test_tool", lambda x: f"processed: {x}")
+        tool_manager.register("test_tool", "processed: {}".format)
         
         # Test tool execution
         result = tool_manager.run("test_tool", "input")
         assert result == "processed: input"
         
         # Test tool sequence
-        tool_manager.register("upper", lambda x: x.upper())
-        tool_manager.register("prefix", lambda x: f"PREFIX:{x}")
+        tool_manager.register("upper", str.upper)
+        tool_manager.register("prefix", "PREFIX:{}".format)
         
         result = tool_manager.run_sequence(["upper", "prefix"], "test")
         assert result == "PREFIX:TEST"
         
+        # Independent tools can fan out over the same input
+        assert tool_manager.run_parallel(["upper", "prefix"], "test") == ["TEST", "PREFIX:test"]
+        
+        # Cacheable tools run once per distinct input
+        calls = []
+        tool_manager.register("counted", lambda x: calls.append(x) or x, cacheable=True)
+        assert tool_manager.run("counted", "a") == tool_manager.run("counted", "a") == "a"
+        assert calls == ["a"]
+        
+        async_tools = AsyncToolManager()
+        async_tools.register("upper", str.upper)
+        async def aprefix(x):
+            return f"PREFIX:{x}"
+        async_tools.register("prefix", aprefix)
+        assert asyncio.run(async_tools.run_sequence(["upper", "prefix"], "test")) == "PREFIX:TEST"
+        assert asyncio.run(async_tools.run_parallel(["upper", "prefix"], "test")) == ["TEST", "PREFIX:test"]
+        
         self.add_result("Tool Manager", True, "ToolManager registration and execution works correctly")
     
     def test_task_functionality(self):
@@ -251,6 +425,9 @@ class ValidationSuite:
         
         task_json = task.to_json()
         assert isinstance(task_json, str)
+        task.history.append("step")
+        assert '"step"' in task.to_json()
+        assert Task(description="caf\u00e9").to_json().count("\\u00e9") == 1  # ASCII-escaped on disk
         
         # Test deserialization
         loaded_task = Task.from_json(task_json)
@@ -268,7 +445,7 @@ class ValidationSuite:
         ]
         
         tools = ["echo", "upper", "exec"]
-        assign_agents_and_tools(tasks, tools)
+        cached_import("assignment", "assign_agents_and_tools")(tasks, tools)
         
         # Check that assignments were made
         for task in tasks:
@@ -276,18 +453,20 @@ class ValidationSuite:
             assert isinstance(task.pre_tools, list)
             assert isinstance(task.post_tools, list)
         
-        # Verify specific assignments based on keywords
-        code_task = next(t for t in tasks if "code" in t.description.lower())
+        # Verify specific assignments based on keywords; only the first task mentions code
+        code_task, *other_tasks = tasks
         assert "exec" in code_task.pre_tools
+        assert all("exec" not in t.pre_tools for t in other_tasks)
         
         self.add_result("Assignment Logic", True, "Agent and tool assignment works correctly")
     
     def test_evolver_evaluator_judge(self):
         """Test 9: Test MCST components (evolver, evaluator, judge)."""
-        model_config = {"model": "test", "temperature": 0.7}
+        stack = mcst_stack()
+        model_config = stack["model_config"]
         
         # Test EvolverAgent
-        evolver = EvolverAgent(name="evolver", model_config=model_config)
+        evolver = stack["evolver"]
         base_agent = EvolvingAgent(
             name="base", model_config=model_config,
             prompt="base prompt", code="base code", version="v1_0"
@@ -299,13 +478,14 @@ class ValidationSuite:
         assert all(child.parent == base_agent.version for child in children)
         
         # Test EvaluatorAgent
-        evaluator = EvaluatorAgent()
+        evaluator = stack["evaluator"]
         score = evaluator.evaluate(children[0])
+        assert score == len(children[0].code)
         assert isinstance(score, int)
         assert "score" in children[0].metadata
         
         # Test JudgeAgent
-        judge = JudgeAgent()
+        judge = stack["judge"]
         results = [(child, evaluator.evaluate(child)) for child in children]
         winner = judge.choose(results)
         assert isinstance(winner, EvolvingAgent)
@@ -314,7 +494,8 @@ class ValidationSuite:
     
     def test_mcst_executor(self):
         """Test 10: Test MCSTExecutor functionality."""
-        model_config = {"model": "test", "temperature": 0.7}
+        stack = mcst_stack()
+        model_config = stack["model_config"]
         
         # Create components
         task = Task(description="test_evolution_task")
@@ -322,10 +503,8 @@ class ValidationSuite:
             name="initial", model_config=model_config,
             prompt="initial prompt", code="initial code", version="v1_0"
         )
-        evolver = EvolverAgent(name="evolver", model_config=model_config)
-        evaluator = EvaluatorAgent()
-        judge = JudgeAgent()
-        memory_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "test_memory.json"))
+        evolver, evaluator, judge = stack["evolver"], stack["evaluator"], stack["judge"]
+        memory_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "test_memory.jsonl"))
         
         # Run MCST
         executor = MCSTExecutor(branching_factor=2, max_depth=1, work_dir=self.temp_dir)
@@ -334,21 +513,37 @@ class ValidationSuite:
         assert isinstance(best_agent, EvolvingAgent)
         assert best_agent.version != initial_agent.version  # Should have evolved
         
+        # The run leaves the caller's memory manager flushed and still usable
+        assert list(memory_manager.read_all())[-1]["branch_id"] == best_agent.version
+        memory_manager.add_evolution("after_run", best_agent.version, "c", "p", None, 1, "reused")
+        memory_manager.flush()
+        assert list(memory_manager.read_all())[-1]["branch_id"] == "after_run"
+        memory_manager.close()
+        
         # Check that evolution log was created
         run_dir = os.path.join(self.temp_dir, task.description.replace(" ", "_"))
         tree_file = os.path.join(run_dir, "tree.json")
         assert os.path.exists(tree_file)
         
-        with open(tree_file, 'r') as f:
-            tree_data = json.load(f)
+        with open(tree_file, 'rb') as f:
+            tree_data = json_utils.loads(f.read())
             assert "root" in tree_data
-            assert "nodes" in tree_data
+            assert "nodes_file" in tree_data
+        with open(os.path.join(run_dir, tree_data["nodes_file"]), 'rb') as f:
+            nodes = [json_utils.loads(line) for line in f]
+            assert nodes[0]["version"] == tree_data["root"]
+            assert nodes[-1]["version"] == best_agent.version
+        
+        # The async variant evolves the same way
+        async_best = asyncio.run(executor.arun(task, initial_agent, evolver, evaluator, judge))
+        assert async_best.version == best_agent.version
+        assert executor.score_cache.hits == 2  # same children as the sync run
         
         self.add_result("MCST Executor", True, "MCSTExecutor evolution loop works correctly")
     
     def test_memory_manager(self):
         """Test 11: Test MemoryManager functionality."""
-        memory_file = os.path.join(self.temp_dir, "test_memory.json")
+        memory_file = os.path.join(self.temp_dir, "test_memory.jsonl")
         memory_manager = MemoryManager(log_file=memory_file)
         
         # Add evolution entry
@@ -365,31 +560,78 @@ class ValidationSuite:
         # Verify file was created and contains data
         assert os.path.exists(memory_file)
         
-        with open(memory_file, 'r') as f:
-            data = json.load(f)
-            assert isinstance(data, list)
-            assert len(data) >= 1
-            
-            entry = data[-1]  # Last entry
-            assert entry["branch_id"] == "v2_0"
-            assert entry["parent_id"] == "v1_0"
-            assert entry["score"] == 85
+        data = list(memory_manager.read_all())
+        assert len(data) >= 1
+        
+        entry = data[-1]  # Last entry
+        assert entry["branch_id"] == "v2_0"
+        assert entry["parent_id"] == "v1_0"
+        assert entry["score"] == 85
+        
+        memory_manager.batch_add([MemoryManager.entry("v3_0", "v2_0", "c", "p", None, 90, "batch")] * 2)
+        export_file = os.path.join(self.temp_dir, "test_memory_export.json")
+        exported = memory_manager.export_json(export_file)
+        assert [e["branch_id"] for e in exported[-3:]] == ["v2_0", "v3_0", "v3_0"]
+        with open(export_file, 'rb') as f:
+            assert json_utils.loads(f.read()) == exported
+        # A failed write is raised from flush and does not stop later writes
+        os.remove(memory_file)
+        os.mkdir(memory_file)
+        memory_manager.add_evolution("v4_0", "v3_0", "c", "p", None, 96, "unwritable")
+        try:
+            memory_manager.flush()
+            assert False, "Should have raised OSError"
+        except OSError:
+            pass
+        os.rmdir(memory_file)
+        memory_manager.add_evolution("v5_0", "v3_0", "c", "p", None, 97, "recovered")
+        assert [e["branch_id"] for e in memory_manager.read_all()] == ["v5_0"]
+        
+        # close drains the writer thread; later entries are appended directly
+        memory_manager.add_evolution("v6_0", "v5_0", "c", "p", None, 98, "queued")
+        memory_manager.close()
+        assert list(memory_manager.read_all())[-1]["branch_id"] == "v6_0"
+        memory_manager.add_evolution("v7_0", "v6_0", "c", "p", None, 99, "after close")
+        assert [e["branch_id"] for e in memory_manager.read_all()] == ["v5_0", "v6_0", "v7_0"]
+        
+        # Closing while other threads add entries neither hangs nor loses any
+        race_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "race_memory.jsonl"))
+        def add_many(prefix):
+            for i in range(200):
+                race_manager.add_evolution(f"{prefix}{i}", None, "c", "p", None, i, "race")
+        writers = [threading.Thread(target=add_many, args=(prefix,)) for prefix in "ab"]
+        for writer in writers:
+            writer.start()
+        race_manager.close()
+        for writer in writers:
+            writer.join()
+        assert len(list(race_manager.read_all())) == 400
+        
+        # A JSON array log from older versions is imported into the new log
+        legacy_file = os.path.join(self.temp_dir, "legacy_memory.json")
+        with open(legacy_file, 'wb') as f:
+            f.write(json_utils.dumps([MemoryManager.entry("v1_0", None, "c", "p", None, 1, "legacy")]))
+        legacy_manager = MemoryManager(log_file=os.path.join(self.temp_dir, "legacy_memory.jsonl"))
+        legacy_manager.add_evolution("v2_0", "v1_0", "c", "p", None, 2, "new")
+        assert [e["branch_id"] for e in legacy_manager.read_all()] == ["v1_0", "v2_0"]
+        legacy_manager.close()
         
         self.add_result("Memory Manager", True, "MemoryManager logging works correctly")
     
     def test_workflow_execution(self):
         """Test 12: Test complete workflow execution."""
         # Test build_workflow_manager
-        manager = build_workflow_manager()
+        manager = build_workflow_manager_cached()
+        assert build_workflow_manager_cached() is manager
         
         assert "Clarifier" in manager.agents
         assert "Designer" in manager.agents
         assert "TaskMaker" in manager.agents
         
         # Test workflow connections
-        assert manager.connections["Clarifier"] == ["Designer"]
-        assert manager.connections["Designer"] == ["TaskMaker"]
-        assert manager.connections["TaskMaker"] == []
+        assert manager.connections["Clarifier"] == ("Designer",)
+        assert manager.connections["Designer"] == ("TaskMaker",)
+        assert manager.connections["TaskMaker"] == ()
         
         # Test tool registration
         assert "echo" in manager.tool_manager._tools
@@ -400,7 +642,7 @@ class ValidationSuite:
     
     def test_mock_ollama(self):
         """Test 13: Test mock Ollama functionality."""
-        response = mock_ollama.chat(
+        response = cached_import("mock_ollama", "chat")(
             model="test",
             messages=[{"role": "user", "content": "test message"}]
         )
@@ -424,18 +666,26 @@ class ValidationSuite:
         except ValueError as e:
             assert "not registered" in str(e)
         
-        # Test agent retry logic
+        # Test agent retry logic; the validator counts its calls and always rejects
+        calls = [0]
+        def val(x):
+            calls[0] += 1
+            return False
         agent = LLMAgent(
             name="FailingAgent",
-            model_config=model_config,
+            model_config={**model_config, "top_p": 0.9,
+                          "frequency_penalty": 0.0, "presence_penalty": 0.0},
             system="Test",
             retry_limit=2,
-            validate_fn=lambda x: False  # Always fail validation
+            validate_fn=val
         )
         
-        result = agent.run_with_retries("test input")
+        # Each attempt gets a fresh output, so no cached verdict applies
+        attempts = itertools.count(1)
+        with patch_agent_module(ollama_chat=lambda **kwargs: {"message": {"content": f"attempt {next(attempts)}"}}):
+            result = agent.run_with_retries("test input")
         assert result["success"] is False
-        assert agent.retry_count == 2
+        assert calls[0] == 2 and agent.retry_count == 2
         
         self.add_result("Error Handling", True, "Error handling and retry logic work correctly")
     
@@ -463,47 +713,227 @@ class ValidationSuite:
         assert loaded_agent.prompt == "test prompt"
         assert loaded_agent.version == "v1_0"  # Default version
         
-        self.add_result("File Operations", True, "File I/O operations work correctly")
-    
-    def run_all_tests(self):
-        """Run all validation tests."""
-        print("=" * 60)
-        print("AGENT WORKFLOW PROJECT - COMPREHENSIVE VALIDATION SUITE")
-        print("=" * 60)
+        # Child versions can be stored as a delta against their parent's code
+        parent_code = "# test code\nprint('a')\nprint('b')\n"
+        child = EvolvingAgent(name="Child", model_config=model_config, prompt="child prompt",
+                              code=parent_code.replace("'b'", "'c'") + "# mutation 0\n")
+        child_path = os.path.join(self.temp_dir, "child_agent.py")
+        child.save(child_path, prompt_path, base_code=parent_code)
+        assert not os.path.exists(child_path)
+        loaded_child = EvolvingAgent.load(
+            child_path, prompt_path, base_code=parent_code,
+            name="LoadedChild", model_config=model_config, system="Test"
+        )
+        assert loaded_child.code == child.code
         
-        self.setUp()
+        # Several agents can share one archive
+        archive_path = os.path.join(self.temp_dir, "agents.tar")
+        EvolvingAgent.save_many([loaded_agent, child], archive_path)
+        archived = EvolvingAgent.load_many(archive_path, model_config=model_config, system="Test")
+        assert [a.name for a in archived] == ["LoadedAgent", "Child"]
+        assert archived[1].code == child.code and archived[1].prompt == "child prompt"
         
-        try:
-            # Core functionality tests
-            self.run_test(self.test_imports_and_dependencies, "Import Dependencies")
-            self.run_test(self.test_agent_creation, "Agent Creation")
-            self.run_test(self.test_evolving_agent, "Evolving Agent")
-            self.run_test(self.test_workflow_manager, "Workflow Manager")
-            self.run_test(self.test_tools, "Tool Functionality")
-            self.run_test(self.test_tool_manager, "Tool Manager")
-            self.run_test(self.test_task_functionality, "Task Functionality")
-            self.run_test(self.test_assignment, "Assignment Logic")
+        self.add_result("File Operations", True, "File I/O operations work correctly")
+    
+    def test_streaming_fallback(self):
+        """Test 16: Streaming agents fall back to the mock when Ollama is unreachable."""
+        model_config = {"model": "test", "temperature": 0.7, "top_p": 0.9,
+                        "frequency_penalty": 0.0, "presence_penalty": 0.0}
+        
+        # A port that was just released refuses connections
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        
+        # Like ollama-python, streamed responses only connect once iterated
+        def unreachable_chat(**kwargs):
+            def chunks():
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                yield {"message": {"content": "unreachable"}}
+            return chunks()
+        
+        async def unreachable_achat(**kwargs):
+            async def chunks():
+                await asyncio.open_connection("127.0.0.1", port)
+                yield {"message": {"content": "unreachable"}}
+            return chunks()
+        
+        module = sys.modules[LLMAgent.__module__]
+        with patch_agent_module(
+            ollama_chat=lambda **kwargs: module._chat_with_fallback(unreachable_chat, kwargs),
+            ollama_achat=lambda **kwargs: module._achat_with_fallback(unreachable_achat, kwargs),
+        ):
+            tokens = []
+            agent = LLMAgent(name="StreamingAgent", model_config=model_config, on_token=tokens.append)
+            result = agent.execute("Test input")
+            assert result["success"] and "MOCK RESPONSE" in result["output"]
+            assert len(tokens) > 1
             
-            # MCST and evolution tests
-            self.run_test(self.test_evolver_evaluator_judge, "MCST Components")
-            self.run_test(self.test_mcst_executor, "MCST Executor")
-            self.run_test(self.test_memory_manager, "Memory Manager")
+            tokens.clear()
+            result = asyncio.run(agent.aexecute("Test input"))
+            assert result["success"] and "MOCK RESPONSE" in result["output"]
+            assert len(tokens) > 1
+        
+        self.add_result("Streaming Fallback", True, "Streaming agents fall back to the mock when Ollama is unreachable")
+    
+    def test_response_cache(self):
+        """Test 17: Validated responses are replayed only when cache_responses is on."""
+        calls = []
+        with patch_agent_module(ollama_chat=counting_chat(calls)):
+            # Off by default: every request reaches the model
+            agent = LLMAgent(name="PlainAgent", model_config=dict(AGENT_MODEL_CONFIG),
+                             system="Test system prompt")
+            result = agent.execute("Test input")
+            assert agent.execute("Test input") == result
+            assert len(calls) == 2
             
-            # Integration tests
-            self.run_test(self.test_workflow_execution, "Workflow Execution")
-            self.run_test(self.test_mock_ollama, "Mock Ollama")
+            # Identical requests under the same config are replayed
+            calls.clear()
+            caching_agent = LLMAgent(name="CachingAgent", model_config=dict(AGENT_MODEL_CONFIG),
+                                     system="Test system prompt", cache_responses=True)
+            assert caching_agent.execute("Test input") == result
+            assert caching_agent.execute("Test input") == result
+            assert len(calls) == 1
             
-            # Edge case and error tests
-            self.run_test(self.test_error_handling, "Error Handling")
-            self.run_test(self.test_file_operations, "File Operations")
+            # A changed config is a different request
+            caching_agent.model_config = dict(AGENT_MODEL_CONFIG, temperature=0.2)
+            caching_agent.execute("Test input")
+            assert len(calls) == 2
+        
+        self.add_result("Response Cache", True, "Responses are cached per config when enabled")
+    
+    def test_semantic_cache(self):
+        """Test 18: Near-duplicate prompts are served from the semantic cache when enabled."""
+        calls = []
+        with patch_agent_module(ollama_chat=counting_chat(calls)):
+            agent = LLMAgent(name="SemanticAgent", system="Test system prompt",
+                             model_config=dict(AGENT_MODEL_CONFIG, semantic_cache=True))
+            first = agent.execute("Build a web app")
+            assert agent.execute("build a  web app")["output"] == first["output"]
+            assert len(calls) == 1
             
+            # Unrelated prompts still reach the model
+            agent.execute("Sort a list of numbers")
+            assert len(calls) == 2
+        
+        self.add_result("Semantic Cache", True, "Near-duplicate prompts reuse validated outputs")
+    
+    def test_streaming(self):
+        """Test 19: Streaming agents pass every token to their callback."""
+        result = LLMAgent(name="PlainAgent", model_config=dict(AGENT_MODEL_CONFIG)).execute("Test input")
+        
+        # The streamed output is handled like an unstreamed one
+        tokens = []
+        agent = LLMAgent(name="StreamingAgent", model_config=dict(AGENT_MODEL_CONFIG),
+                         on_token=tokens.append)
+        assert agent.execute("Test input") == result
+        assert len(tokens) > 1
+        
+        # A callback returning False rejects the output after the first token
+        rejected = []
+        rejecting_agent = LLMAgent(name="RejectingAgent", model_config=dict(AGENT_MODEL_CONFIG),
+                                   on_token=lambda token: rejected.append(token) or False)
+        assert rejecting_agent.execute("Test input")["success"] is False
+        assert len(rejected) == 1
+        
+        # A per-call callback replaces the agent's own for that call only
+        streamed = []
+        seen = len(tokens)
+        assert agent.run_with_retries("Other input", streaming_callback=streamed.append)["success"]
+        assert len(streamed) > 1 and len(tokens) == seen
+        agent.execute("Test input")
+        assert len(tokens) > seen
+        
+        self.add_result("Streaming", True, "Tokens are streamed to the agent and per-call callbacks")
+    
+    def test_keep_alive(self):
+        """Test 20: keep_alive is forwarded to Ollama only when configured."""
+        calls = []
+        with patch_agent_module(ollama_chat=counting_chat(calls)):
+            resident = LLMAgent(name="ResidentAgent", model_config=dict(AGENT_MODEL_CONFIG, keep_alive="30m"))
+            plain = LLMAgent(name="PlainAgent", model_config=dict(AGENT_MODEL_CONFIG))
+            assert resident.execute("Test input") == plain.execute("Test input")
+        assert calls[0]["keep_alive"] == "30m"
+        assert "keep_alive" not in calls[1]
+        
+        self.add_result("Keep Alive", True, "keep_alive is passed through to the chat call")
+    
+    # (method, test name) in report order; every test only touches its own temp dir
+    TESTS = [
+        # Core functionality tests
+        ("test_imports_and_dependencies", "Import Dependencies"),
+        ("test_agent_creation", "Agent Creation"),
+        ("test_streaming_fallback", "Streaming Fallback"),
+        ("test_response_cache", "Response Cache"),
+        ("test_semantic_cache", "Semantic Cache"),
+        ("test_streaming", "Streaming"),
+        ("test_keep_alive", "Keep Alive"),
+        ("test_evolving_agent", "Evolving Agent"),
+        ("test_workflow_manager", "Workflow Manager"),
+        ("test_tools", "Tool Functionality"),
+        ("test_tool_manager", "Tool Manager"),
+        ("test_task_functionality", "Task Functionality"),
+        ("test_assignment", "Assignment Logic"),
+        
+        # MCST and evolution tests
+        ("test_evolver_evaluator_judge", "MCST Components"),
+        ("test_mcst_executor", "MCST Executor"),
+        ("test_memory_manager", "Memory Manager"),
+        
+        # Integration tests
+        ("test_workflow_execution", "Workflow Execution"),
+        ("test_mock_ollama", "Mock Ollama"),
+        
+        # Edge case and error tests
+        ("test_error_handling", "Error Handling"),
+        ("test_file_operations", "File Operations"),
+    ]
+    
+    def run_all_tests(self, workers: int = None):
+        """Run all validation tests.
+        
+        With more than one worker (``VALIDATION_WORKERS``, default: CPU count
+        minus two) each test runs in its own process; results and output are
+        still reported in ``TESTS`` order.
+        """
+        buf = io.StringIO()
+        out = partial(print, file=buf)
+        out("=" * 60)
+        out("AGENT WORKFLOW PROJECT - COMPREHENSIVE VALIDATION SUITE")
+        out("=" * 60)
+        
+        if workers is None:
+            workers = int(os.environ.get("VALIDATION_WORKERS", (os.cpu_count() or 1) - 2))
+        
+        # Test output is collected and written to the real stdout in one go
+        try:
+            if workers > 1:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # Import everything the tests use up front so forked workers inherit it
+                for module_name, item_name in _PRELOAD:
+                    cached_import(module_name, item_name)
+                mp_context = None
+                if "fork" in multiprocessing.get_all_start_methods():
+                    mp_context = multiprocessing.get_context("fork")
+                with ProcessPoolExecutor(max_workers=min(workers, len(self.TESTS)),
+                                         mp_context=mp_context) as pool:
+                    for results, output in pool.map(_run_isolated, *zip(*self.TESTS)):
+                        for result in results:
+                            self._record(result)
+                        buf.write(output)
+            else:
+                with contextlib.redirect_stdout(buf):
+                    for method_name, test_name in self.TESTS:
+                        self.run_test(getattr(self, method_name), test_name)
         finally:
-            self.tearDown()
+            sys.stdout.write(buf.getvalue())
+            sys.stdout.flush()
     
     def generate_report(self) -> Dict[str, Any]:
         """Generate comprehensive validation report."""
         total_tests = len(self.results)
-        passed_tests = sum(1 for r in self.results if r.passed)
+        passed_tests = self.passed_count
         failed_tests = total_tests - passed_tests
         
         report = {
@@ -514,16 +944,7 @@ class ValidationSuite:
                 "success_rate": (passed_tests / total_tests * 100) if total_tests > 0 else 0,
                 "timestamp": datetime.now().isoformat()
             },
-            "test_results": [
-                {
-                    "test_name": r.test_name,
-                    "passed": r.passed,
-                    "message": r.message,
-                    "details": r.details,
-                    "timestamp": r.timestamp
-                }
-                for r in self.results
-            ],
+            "test_results": [r.to_dict() for r in self.results],
             "failed_tests": [
                 {
                     "test_name": r.test_name,
@@ -539,7 +960,7 @@ class ValidationSuite:
     def print_summary(self):
         """Print test summary."""
         total = len(self.results)
-        passed = sum(1 for r in self.results if r.passed)
+        passed = self.passed_count
         failed = total - passed
         
         print("\n" + "=" * 60)
@@ -559,22 +980,35 @@ class ValidationSuite:
         print("=" * 60)
 
 
+def _run_isolated(method_name: str, test_name: str):
+    """Run one test in a fresh suite, returning its results and output."""
+    suite = ValidationSuite()
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        suite.run_test(getattr(suite, method_name), test_name)
+    suite.wait_for_cleanup()
+    return suite.results, buf.getvalue()
+
+
 def main():
     """Main validation entry point."""
-    suite = ValidationSuite()
-    suite.run_all_tests()
+    suite = ValidationSuite(stream_path="validation_report.jsonl")
+    try:
+        suite.run_all_tests()
+    finally:
+        suite.close()
     suite.print_summary()
     
     # Save detailed report
     report = suite.generate_report()
-    with open("validation_report.json", "w") as f:
-        json.dump(report, f, indent=2)
+    with open("validation_report.json", "wb") as f:
+        f.write(json_utils.dumps(report, indent=True))
+    suite.wait_for_cleanup()
     
     print(f"\nDetailed report saved to: validation_report.json")
     
     # Return exit code based on test results
-    failed_tests = sum(1 for r in suite.results if not r.passed)
-    return 0 if failed_tests == 0 else 1
+    return 0 if suite.passed_count == len(suite.results) else 1
 
 
 if __name__ == "__main__":